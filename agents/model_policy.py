@@ -0,0 +1,192 @@
+"""
+Model Policy - Cascata de modelos por tier.
+
+Nem todo turno precisa do mesmo modelo: "beleza, valeu" não pede uma
+análise de impacto no repositório.
+
+TIERS:
+    - fast: modelo barato e rápido (MODEL_FAST_ID), para conversa simples
+    - strong: modelo maior (MODEL_STRONG_ID), para turnos com
+      ferramentas de GitHub e geração de PRD
+
+FALLBACK:
+    Cada tier tem um orçamento de latência (MODEL_*_TIMEOUT). Se o run
+    estourar o orçamento, a mesma chamada é refeita no outro tier
+    (fast → strong, strong → fast), uma única vez, com o maior dos dois
+    orçamentos (um PRD que estourou 90s no forte não cabe nos 20s do
+    rápido). O tier troca só o modelo: quem chama mantém a configuração
+    do agente (ex.: o PM com ferramentas continua com ferramentas no
+    modelo rápido). Agentes de modelo fixo (o Team) usam fallback=False.
+
+INSTÂNCIAS (AgentPool):
+    O thread de um run que estourou o orçamento não é interrompido e
+    segue usando o seu agente até terminar. Por isso cada run pega uma
+    instância livre do pool e só a devolve quando o thread termina:
+    o próximo turno nunca divide um agente com um run atrasado.
+
+MÉTRICAS (observability.metrics):
+    - model.route{agent,tier}: runs concluídos por tier
+    - model.timeout{agent,tier}: runs que estouraram o orçamento
+    - model.fallback{agent,from_tier,to_tier}: trocas de tier
+    - model.latency{agent,tier}: latência dos runs concluídos
+
+USO:
+    from agents.model_policy import AgentPool, choose_tier, run_tiered
+
+    pool = AgentPool(create_pm_agent, "PM Agent")
+    tier = choose_tier(intent)
+    response, used = await run_tiered(lambda t: pool.runner(t.name, True)(msg), tier, agent="pm")
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from config import settings
+from observability import metrics
+from observability.spans import set_attribute
+
+
+logger = logging.getLogger(__name__)
+
+FAST = "fast"
+STRONG = "strong"
+
+# Intenções atendidas pelo tier rápido (as demais usam ferramentas ou geram PRD)
+FAST_INTENTS = {"small_talk"}
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """Configuração de um tier de modelo."""
+
+    name: str
+    model_id: str
+    timeout: float
+    fallback: str | None
+
+
+def get_tiers() -> dict[str, ModelTier]:
+    """Tiers configurados em Settings."""
+    return {
+        FAST: ModelTier(FAST, settings.MODEL_FAST_ID, settings.MODEL_FAST_TIMEOUT, STRONG),
+        STRONG: ModelTier(STRONG, settings.MODEL_STRONG_ID, settings.MODEL_STRONG_TIMEOUT, FAST),
+    }
+
+
+def model_id_for(tier: str) -> str:
+    """ID do modelo de um tier."""
+    return get_tiers()[tier].model_id
+
+
+def choose_tier(intent: str) -> str:
+    """
+    Escolhe o tier para a intenção da mensagem.
+
+    Conversa simples vai para o tier rápido; o resto, para o forte.
+    """
+    return FAST if intent in FAST_INTENTS else STRONG
+
+
+async def run_tiered(
+    run: Callable[[ModelTier], Any],
+    tier: str,
+    agent: str,
+    fallback: bool = True,
+) -> tuple[Any, str]:
+    """
+    Executa `run(tier)` em uma thread, com orçamento de latência e fallback.
+
+    Args:
+        run: Função síncrona que faz o run do agente do tier recebido
+        tier: Tier inicial (FAST ou STRONG)
+        agent: Nome do agente, usado nas métricas
+        fallback: Se tenta o outro tier quando o orçamento estoura
+
+    Returns:
+        tuple[Any, str]: Resposta do run e tier que a produziu
+
+    Raises:
+        asyncio.TimeoutError: Se nenhum tier responder dentro do orçamento
+    """
+    tiers = get_tiers()
+    order = [tier]
+    if fallback and tiers[tier].fallback:
+        order.append(tiers[tier].fallback)
+
+    for i, name in enumerate(order):
+        current = tiers[name]
+        # O fallback herda o orçamento do tier inicial, se for maior
+        budget = max(current.timeout, tiers[tier].timeout)
+        start = time.monotonic()
+        try:
+            # O thread do run que estourou o orçamento termina sozinho em background
+            # (com o agente ainda emprestado do pool, ver AgentPool)
+            response = await asyncio.wait_for(asyncio.to_thread(run, current), timeout=budget)
+        except asyncio.TimeoutError:
+            metrics.increment("model.timeout", agent=agent, tier=name)
+            if i == len(order) - 1:
+                raise asyncio.TimeoutError(
+                    f"{agent}: sem resposta em {budget:.0f}s (tiers: {' → '.join(order)})"
+                ) from None
+            next_tier = order[i + 1]
+            logger.warning(
+                f"{agent}: tier {name} ({current.model_id}) passou de {budget:.0f}s, "
+                f"tentando {next_tier}"
+            )
+            metrics.increment("model.fallback", agent=agent, from_tier=name, to_tier=next_tier)
+            continue
+
+        elapsed = time.monotonic() - start
+        metrics.increment("model.route", agent=agent, tier=name)
+        metrics.observe("model.latency", elapsed, agent=agent, tier=name)
+        set_attribute("model.tier", name)
+        set_attribute("model.id", current.model_id)
+        logger.info(f"{agent}: tier {name} ({current.model_id}) em {elapsed:.1f}s")
+        return response, name
+
+
+class AgentPool:
+    """
+    Instâncias de agente emprestadas por run, agrupadas por chave.
+
+    A chave são os argumentos da fábrica (ex.: (tier, tools) para o PM).
+    Uma instância só volta para o pool quando o run que a usa termina,
+    mesmo que o turno já tenha desistido dele por timeout.
+
+    Example:
+        >>> pool = AgentPool(create_tech_writer_agent, "Tech Writer")
+        >>> run = pool.runner(STRONG)  # nada é criado até chamar
+        >>> response = run("Gere um PRD...")
+    """
+
+    def __init__(self, factory: Callable[..., Any], name: str):
+        self.factory = factory
+        self.name = name
+        self._idle: dict[tuple, list] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def runner(self, *key) -> Callable[..., Any]:
+        """
+        Retorna uma função que empresta um agente, roda `agent.run` e devolve.
+
+        O agente só é resolvido quando a função é chamada (no replay, o
+        recorder responde antes e nenhum agente é criado).
+        """
+        def run(*args, **kwargs):
+            with self._lock:
+                idle = self._idle[key]
+                agent = idle.pop() if idle else None
+            if agent is None:
+                logger.info(f"Criando {self.name} {key}...")
+                agent = self.factory(*key)
+            try:
+                return agent.run(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._idle[key].append(agent)
+        return run
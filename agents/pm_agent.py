@@ -12,6 +12,16 @@ FLUXO:
 
 FERRAMENTAS:
     - GithubTools: Acesso ao repositório para análise de código
+    - search_code_batch: Várias buscas de código em paralelo, numa só chamada
+
+MODELOS (agents.model_policy):
+    - O tier define só o modelo (strong ou fast)
+    - tools=True (padrão): ferramentas de GitHub, digest e instruções completas
+    - tools=False: conversa simples, sem ferramentas nem digest
+
+CONTEXTO:
+    - Digest do repositório (árvore, módulos, símbolos) do commit mais
+      recente, mantido por tools.repo_digest e colocado antes das instruções
     
 INSTRUÇÕES IMPORTANTES:
     O PM NUNCA deve prosseguir sem ter respostas claras do CEO sobre:
@@ -25,6 +35,10 @@ from agno.models.openai import OpenAIChat
 from agno.tools.github import GithubTools
 
 from config import settings
+from agents.model_policy import FAST, STRONG, model_id_for
+from observability import recorder, spans
+from tools.code_search import search_code_batch
+from tools.repo_digest import get_digest_text
 
 
 # Instruções detalhadas que guiam o comportamento do PM
@@ -36,7 +50,8 @@ Fale SEMPRE em primeira pessoa, de forma natural e direta.
 
 Você TEM ACESSO ao repositório do projeto. USE SEMPRE as ferramentas para:
 - `get_repository`: Ver estrutura geral do projeto
-- `search_code`: Buscar código específico (funções, classes, keywords)
+- `search_code_batch`: Buscar VÁRIOS termos de uma vez (funções, classes, keywords)
+- `search_code`: Buscar um único termo específico
 - `list_pull_requests`: Ver PRs abertos
 - `get_pull_request`: Detalhes de um PR
 
@@ -44,8 +59,9 @@ Você TEM ACESSO ao repositório do projeto. USE SEMPRE as ferramentas para:
 
 Quando o CEO perguntar sobre uma feature ou parte do código:
 
-1. PRIMEIRO use `search_code` para encontrar arquivos relacionados
-   Exemplo: se perguntou sobre "login", busque por "login", "auth", "signin"
+1. PRIMEIRO use `search_code_batch` UMA VEZ com todos os termos relacionados
+   Exemplo: se perguntou sobre "login", chame search_code_batch(["login", "auth", "signin"])
+   Os arquivos que aparecem em mais termos vêm primeiro
 
 2. LISTE os arquivos encontrados e explique o que cada um faz
 
@@ -56,12 +72,12 @@ Quando o CEO perguntar sobre uma feature ou parte do código:
 ## EXEMPLOS
 
 CEO: "Como tá a parte de login?"
-→ Use search_code("login") e search_code("auth")
+→ Use search_code_batch(["login", "auth", "signin"])
 → Liste os arquivos encontrados
 → Explique: "Olhando aqui no código, vi que vocês têm..."
 
 CEO: "Quero adicionar feature X"
-→ Use search_code para ver se já existe algo parecido
+→ Use search_code_batch com os termos da feature para ver se já existe algo parecido
 → Analise a estrutura atual
 → Sugira onde implementar
 
@@ -78,15 +94,45 @@ Lembro das conversas anteriores. Se o CEO mencionar "aquilo que conversamos",
 continuo de onde paramos.
 """
 
+# Orientação de uso quando o digest do repositório está disponível
+DIGEST_USAGE = """
+## USO DO DIGEST
+
+O digest acima já mostra a árvore, os módulos e os símbolos principais do
+repositório no commit atual. Responda a partir dele sempre que possível.
+NÃO chame `get_repository` para explorar a estrutura. Só use ferramentas
+quando precisar de um detalhe de código que não está no digest.
+"""
 
-def create_pm_agent() -> Agent:
+
+# Aviso para o PM de conversa simples, que responde sem acesso ao repositório
+FAST_USAGE = """
+## MODO CONVERSA
+
+Agora você está SEM ferramentas: é só conversa rápida (saudação,
+agradecimento, confirmação). Responda em uma ou duas frases, sem
+inventar nada sobre o código.
+"""
+
+
+def create_pm_agent(tier: str = STRONG, tools: bool = True) -> Agent:
     """
     Cria e retorna o agente PM configurado.
     
     O agente usa:
-    - GPT-4o-mini como modelo (configurável via .env)
+    - O modelo do tier (MODEL_STRONG_ID ou MODEL_FAST_ID, via .env)
     - GithubTools para análise de repositório
-    - Instruções detalhadas para comportamento consistente
+    - search_code_batch para buscas em lote (uma ida ao LLM para N termos)
+    - Instruções detalhadas para comportamento consistente, precedidas
+      pelo digest do repositório (reavaliado a cada run)
+    
+    Com tools=False (conversa simples), o agente não recebe ferramentas
+    nem digest. O fallback de um run com ferramentas mantém tools=True,
+    só trocando o modelo.
+    
+    Args:
+        tier: Tier do modelo (STRONG ou FAST)
+        tools: Se o agente tem acesso ao repositório
     
     Returns:
         Agent: Agente PM pronto para uso
@@ -111,19 +157,38 @@ def create_pm_agent() -> Agent:
 O repositório que você deve analisar é: **{settings.GITHUB_REPO}**
 
 Quando usar as ferramentas, SEMPRE especifique este repositório:
+- search_code_batch(queries=["login", "auth"], repo="{settings.GITHUB_REPO}")
 - search_code(query="login", repo="{settings.GITHUB_REPO}")
 - get_repository(repo="{settings.GITHUB_REPO}")
 
 IMPORTANTE: Use o repo "{settings.GITHUB_REPO}" em TODAS as buscas.
 """
     
+    def build_instructions(agent=None) -> str:
+        """Prepende o digest atual; muda sozinho quando sai um novo commit."""
+        digest = get_digest_text()
+        if not digest:
+            return instructions
+        return f"{digest}\n\n{DIGEST_USAGE}\n{instructions}"
+    
+    if not tools:
+        return Agent(
+            name="PM Agent",
+            role="Product Manager técnico que analisa demandas e questiona viabilidade",
+            model=OpenAIChat(id=model_id_for(tier)),
+            instructions=instructions + FAST_USAGE,
+            markdown=True,
+        )
+    
     # Cria o agente PM
     agent = Agent(
         name="PM Agent",
         role="Product Manager técnico que analisa demandas e questiona viabilidade",
-        model=OpenAIChat(id=settings.MODEL_ID),
-        instructions=instructions,
-        tools=[github_tools],
+        model=OpenAIChat(id=model_id_for(tier)),
+        instructions=build_instructions,
+        tools=[github_tools, search_code_batch],
+        # Spans por ferramenta e gravação quando TRACE_RECORDING=true
+        tool_hooks=[spans.tool_hook, recorder.tool_hook],
         markdown=True,
     )
     
@@ -134,5 +199,5 @@ IMPORTANTE: Use o repo "{settings.GITHUB_REPO}" em TODAS as buscas.
 if __name__ == "__main__":
     pm = create_pm_agent()
     print(f"✅ PM Agent criado: {pm.name}")
-    print(f"   Modelo: {settings.MODEL_ID}")
+    print(f"   Modelo: {model_id_for(STRONG)} (rápido: {model_id_for(FAST)})")
     print(f"   Repo: {settings.GITHUB_REPO or 'Não configurado'}")
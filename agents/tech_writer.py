@@ -29,6 +29,8 @@ from agno.agent import Agent
 from agno.models.openai import OpenAIChat
 
 from config import settings
+from agents.model_policy import STRONG, model_id_for
+from observability.spans import traced
 
 
 # Template de instruções para geração de PRD
@@ -111,15 +113,18 @@ Siga EXATAMENTE esta estrutura:
 """
 
 
-def create_tech_writer_agent() -> Agent:
+def create_tech_writer_agent(tier: str = STRONG) -> Agent:
     """
     Cria e retorna o agente Tech Writer configurado.
     
     O agente usa:
-    - GPT-4o-mini como modelo
+    - O modelo do tier (STRONG por padrão; FAST só como fallback)
     - Instruções focadas em geração de PRD
     - Formato markdown estruturado
     
+    Args:
+        tier: Tier do modelo (STRONG ou FAST)
+    
     Returns:
         Agent: Agente Tech Writer pronto para uso
         
@@ -131,7 +136,7 @@ def create_tech_writer_agent() -> Agent:
     agent = Agent(
         name="Tech Writer",
         role="Especialista em documentação técnica que gera PRDs completos",
-        model=OpenAIChat(id=settings.MODEL_ID),
+        model=OpenAIChat(id=model_id_for(tier)),
         instructions=TECH_WRITER_INSTRUCTIONS,
         markdown=True,
     )
@@ -139,6 +144,7 @@ def create_tech_writer_agent() -> Agent:
     return agent
 
 
+@traced("save_prd")
 def save_prd(content: str, feature_name: str) -> Path:
     """
     Salva o PRD gerado em um arquivo markdown.
@@ -0,0 +1,275 @@
+"""
+Agente Whind - Geração de PRDs em lote.
+
+Alternativa ao chat do Telegram para sessões de grooming de backlog:
+lê um arquivo JSONL de demandas e roda o pipeline PM → Tech Writer →
+save_prd em paralelo.
+
+ENTRADA (uma demanda por linha):
+    {"id": "push-ios", "demand": "Quero notificações push no iOS", "name": "notificacoes_push"}
+
+    - id: identificador único (usado no checkpoint)
+    - demand: texto da demanda
+    - name: nome da feature para o arquivo (opcional, padrão: id)
+
+CHECKPOINT:
+    Cada demanda concluída vai para <entrada>.checkpoint.jsonl. Ao rodar
+    de novo após uma interrupção, as demandas já concluídas são puladas.
+
+RELATÓRIO:
+    PRDs/min, tokens consumidos e latência por etapa (pm, tw, save).
+
+USO:
+    uv run python batch.py demandas.jsonl --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from config import settings
+from agents.pm_agent import create_pm_agent
+from agents.tech_writer import create_tech_writer_agent, save_prd
+
+# Configura logging
+logging.basicConfig(
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    level=logging.INFO,
+)
+logger = logging.getLogger(__name__)
+
+
+# Sem CEO para responder, o PM entrega a análise e registra as dúvidas
+BATCH_PM_PROMPT = """
+Analise a demanda abaixo no repositório. Não há CEO disponível para
+perguntas neste modo: em vez de perguntar, registre as dúvidas em aberto
+(prazo, prioridade, impacto aceitável) como premissas explícitas.
+
+Entregue: arquivos/módulos afetados, dependências, riscos e estimativa.
+
+DEMANDA: {demand}
+"""
+
+TW_PROMPT = """
+Gere um PRD baseado neste contexto:
+
+Demanda do CEO: {demand}
+
+Análise do PM:
+
+{analysis}
+"""
+
+
+def load_demands(path: Path) -> list[dict]:
+    """
+    Lê as demandas do JSONL.
+
+    Raises:
+        ValueError: Se alguma linha não tiver id/demand ou repetir um id
+    """
+    demands = []
+    seen = set()
+    for line_no, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if not item.get("id") or not item.get("demand"):
+            raise ValueError(f"Linha {line_no}: 'id' e 'demand' são obrigatórios")
+        if item["id"] in seen:
+            raise ValueError(f"Linha {line_no}: id repetido '{item['id']}'")
+        seen.add(item["id"])
+        demands.append(item)
+    return demands
+
+
+def load_checkpoint(path: Path) -> set[str]:
+    """Retorna os ids já concluídos."""
+    if not path.exists():
+        return set()
+    done = set()
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            entry = json.loads(line)
+            if entry.get("prd_path"):
+                done.add(entry["id"])
+    return done
+
+
+def _tokens(response) -> dict:
+    """Extrai a contagem de tokens das métricas do run."""
+    metrics = getattr(response, "metrics", None)
+    return {
+        "input": getattr(metrics, "input_tokens", 0) or 0,
+        "output": getattr(metrics, "output_tokens", 0) or 0,
+    }
+
+
+class BatchRunner:
+    """Executa o pipeline com N workers e acumula as métricas."""
+
+    def __init__(self, concurrency: int, checkpoint: Path):
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.tokens = {"input": 0, "output": 0}
+        self.completed = 0
+        self.failed = 0
+        self._lock = asyncio.Lock()
+
+    async def _record(self, entry: dict) -> None:
+        """Grava o resultado de uma demanda no checkpoint."""
+        async with self._lock:
+            with open(self.checkpoint, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    async def _process(self, item: dict, pm, tw) -> None:
+        """
+        Roda PM → Tech Writer → save_prd para uma demanda.
+
+        Os runs vão para threads: as ferramentas do GitHub são síncronas
+        e bloqueariam os outros workers no event loop.
+        """
+        demand_id = item["id"]
+        timings = {}
+
+        start = time.monotonic()
+        pm_response = await asyncio.to_thread(pm.run, BATCH_PM_PROMPT.format(demand=item["demand"]))
+        timings["pm"] = time.monotonic() - start
+        analysis = pm_response.content if hasattr(pm_response, "content") else str(pm_response)
+
+        start = time.monotonic()
+        tw_response = await asyncio.to_thread(
+            tw.run, TW_PROMPT.format(demand=item["demand"], analysis=analysis)
+        )
+        timings["tw"] = time.monotonic() - start
+        prd_text = tw_response.content if hasattr(tw_response, "content") else str(tw_response)
+
+        start = time.monotonic()
+        prd_path = save_prd(prd_text, f"{demand_id}_{item.get('name') or ''}".rstrip("_"))
+        timings["save"] = time.monotonic() - start
+
+        tokens = {k: _tokens(pm_response)[k] + _tokens(tw_response)[k] for k in self.tokens}
+        for stage, seconds in timings.items():
+            self.latencies[stage].append(seconds)
+        for k, v in tokens.items():
+            self.tokens[k] += v
+        self.completed += 1
+
+        await self._record({
+            "id": demand_id,
+            "prd_path": str(prd_path),
+            "tokens": tokens,
+            "latency": {k: round(v, 3) for k, v in timings.items()},
+        })
+        logger.info(f"✅ {demand_id}: {prd_path.name} ({sum(timings.values()):.1f}s)")
+
+    async def _worker(self, queue: asyncio.Queue, pm, tw) -> None:
+        """Consome demandas da fila com seus próprios agentes."""
+        while True:
+            item = await queue.get()
+            try:
+                await self._process(item, pm, tw)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"❌ {item['id']}: {e}", exc_info=True)
+                await self._record({"id": item["id"], "error": str(e)[:500]})
+            finally:
+                queue.task_done()
+
+    async def run(self, demands: list[dict]) -> float:
+        """
+        Processa as demandas e retorna o tempo total em segundos.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in demands:
+            queue.put_nowait(item)
+
+        # Cada worker tem seus agentes: runs concorrentes não dividem estado
+        n_workers = min(self.concurrency, len(demands))
+        agents = [(create_pm_agent(), create_tech_writer_agent()) for _ in range(n_workers)]
+
+        start = time.monotonic()
+        workers = [asyncio.create_task(self._worker(queue, pm, tw)) for pm, tw in agents]
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        return time.monotonic() - start
+
+    def report(self, elapsed: float) -> str:
+        """Monta o relatório de throughput, tokens e latência por etapa."""
+        minutes = elapsed / 60 or 1
+        lines = [
+            "",
+            "📊 RELATÓRIO DO LOTE",
+            f"   PRDs gerados: {self.completed} | falhas: {self.failed}",
+            f"   Tempo total: {elapsed:.1f}s | concorrência: {self.concurrency}",
+            f"   Throughput: {self.completed / minutes:.2f} PRDs/min",
+            f"   Tokens: {self.tokens['input']} entrada + {self.tokens['output']} saída",
+            "   Latência por etapa (s):",
+        ]
+        for stage in ("pm", "tw", "save"):
+            values = sorted(self.latencies.get(stage, []))
+            if not values:
+                continue
+            p95 = statistics.quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+            lines.append(
+                f"     {stage:<5} média {statistics.mean(values):6.2f} | "
+                f"p50 {statistics.median(values):6.2f} | p95 {p95:6.2f} | máx {values[-1]:6.2f}"
+            )
+        return "\n".join(lines)
+
+
+def main():
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description="Gera PRDs em lote a partir de um JSONL de demandas")
+    parser.add_argument("input", type=Path, help="Arquivo JSONL com as demandas")
+    parser.add_argument("--concurrency", type=int, default=4, help="Demandas processadas em paralelo")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Arquivo de checkpoint (padrão: <entrada>.checkpoint.jsonl)",
+    )
+    args = parser.parse_args()
+
+    if not settings.OPENAI_API_KEY:
+        logger.error("❌ OPENAI_API_KEY não configurada")
+        sys.exit(1)
+    if args.concurrency < 1:
+        logger.error("❌ --concurrency deve ser pelo menos 1")
+        sys.exit(1)
+
+    checkpoint = args.checkpoint or args.input.with_suffix(".checkpoint.jsonl")
+    demands = load_demands(args.input)
+    done = load_checkpoint(checkpoint)
+    pending = [d for d in demands if d["id"] not in done]
+
+    logger.info(f"📥 {len(demands)} demandas | {len(done)} já concluídas | {len(pending)} pendentes")
+    logger.info(f"   Modelo: {settings.MODEL_STRONG_ID}")
+    logger.info(f"   Repo: {settings.GITHUB_REPO or 'Não configurado'}")
+    logger.info(f"   Checkpoint: {checkpoint}")
+
+    if not pending:
+        logger.info("Nada a fazer")
+        return
+
+    runner = BatchRunner(args.concurrency, checkpoint)
+    try:
+        elapsed = asyncio.run(runner.run(pending))
+    except KeyboardInterrupt:
+        logger.info("\n⏸️  Interrompido. Rode de novo para continuar do checkpoint.")
+        sys.exit(130)
+
+    print(runner.report(elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,29 @@
 """
 Telegram Bot - Interface conversacional simplificada.
 
-Usa o PM Agent diretamente (sem Team) para garantir
-que as ferramentas de GitHub sejam usadas corretamente.
+Usa o PM Agent diretamente para garantir que as ferramentas de
+GitHub sejam usadas corretamente. Um roteador local de intenções
+decide entre PM, geração/revisão de PRD e conversa; o Team só é
+acionado quando a intenção é ambígua.
+
+Conversa simples vai para o modelo rápido; análise e PRDs, para o
+forte, com troca de tier se o orçamento de latência estourar
+(agents.model_policy). /metricas mostra as decisões de roteamento.
+
+Quando a conversa já cobre prazo, prioridade e impacto, o PRD é
+redigido em background (team.prd_speculator) e o "gerar prd" seguinte
+responde com o rascunho, se nada mudou desde então.
+
+Documentos enviados (PDF, markdown, specs) são indexados por sessão e
+só os trechos relevantes entram no prompt de cada mensagem.
 """
 
+import asyncio
 import logging
 import io
+import tempfile
+import time
+from pathlib import Path
 
 from telegram import Update
 from telegram.ext import (
@@ -19,9 +36,26 @@ from telegram.ext import (
 from openai import AsyncOpenAI
 
 from config import settings
+from observability import metrics, recorder
+from observability.spans import root_span, set_attribute, span, traced
+from agents.model_policy import STRONG, AgentPool, choose_tier, run_tiered
 from agents.pm_agent import create_pm_agent
 from agents.tech_writer import create_tech_writer_agent, save_prd
+from team.intent_router import (
+    AMBIGUOUS,
+    PM_QA,
+    PRD_GENERATE,
+    PRD_REVISE,
+    SMALL_TALK,
+    get_intent_router,
+)
+from team.memory_queue import get_memory_extractor
+from team.prd_speculator import get_prd_speculator
+from team.product_team import create_product_team
 from tools.audio import transcribe_audio_bytes
+from tools.answer_cache import get_answer_cache
+from tools.documents import DocumentError, download_to_disk, get_document_index
+from tools.repo_digest import start_digest_watcher
 
 # Configura logging
 logging.basicConfig(
@@ -30,28 +64,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Agentes e cliente (singletons)
-_pm_agent = None
-_tech_writer = None
+# Agentes por tier, emprestados por run (um run atrasado não divide instância)
+_pm_pool = AgentPool(create_pm_agent, "PM Agent")
+_tech_writer_pool = AgentPool(create_tech_writer_agent, "Tech Writer")
+
+# Team também emprestado por run (modelo fixo: sem troca de tier)
+_team_pool = AgentPool(lambda tier: create_product_team(), "Product Team")
+
+# Cliente (singleton)
 _openai_client = None
 
+# Último PRD gerado por usuário (para revisões)
+_last_prd: dict[int, str] = {}
 
-def get_pm_agent():
-    """Retorna o PM Agent (singleton)."""
-    global _pm_agent
-    if _pm_agent is None:
-        logger.info("Criando PM Agent...")
-        _pm_agent = create_pm_agent()
-    return _pm_agent
+# Último turno com o PM por usuário (respostas curtas continuam com ele
+# até a conversa ficar ociosa por PM_CONVERSATION_IDLE_SECONDS)
+_pm_conversations: dict[int, float] = {}
 
 
-def get_tech_writer():
-    """Retorna o Tech Writer (singleton)."""
-    global _tech_writer
-    if _tech_writer is None:
-        logger.info("Criando Tech Writer...")
-        _tech_writer = create_tech_writer_agent()
-    return _tech_writer
+def in_pm_conversation(user_id: int) -> bool:
+    """Indica se o usuário está numa conversa recente com o PM."""
+    last = _pm_conversations.get(user_id)
+    if last is None:
+        return False
+    if time.monotonic() - last > settings.PM_CONVERSATION_IDLE_SECONDS:
+        del _pm_conversations[user_id]
+        return False
+    return True
+
+# Tarefas em background (referência evita que sejam coletadas antes de terminar)
+_background_tasks: set[asyncio.Task] = set()
 
 
 def get_openai_client():
@@ -62,6 +104,21 @@ def get_openai_client():
     return _openai_client
 
 
+def run_in_background(coro) -> asyncio.Task:
+    """Agenda uma corrotina fora do caminho da resposta, registrando erros no log."""
+    async def _guarded():
+        try:
+            await coro
+        except Exception as e:
+            logger.error(f"Erro em tarefa de background: {e}", exc_info=True)
+    
+    task = asyncio.create_task(_guarded())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+@traced("text_to_speech")
 async def text_to_speech(text: str) -> bytes:
     """Converte texto para áudio usando OpenAI TTS."""
     client = get_openai_client()
@@ -94,66 +151,274 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         await update.message.reply_text(welcome)
 
 
+async def metrics_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler para /metricas: roteamento entre modelos e latências."""
+    await update.message.reply_text(metrics.format_report())
+
+
 async def process_message(update: Update, user_message: str) -> None:
-    """Processa mensagem usando PM Agent diretamente."""
+    """
+    Processa mensagem conforme a intenção detectada localmente.
+    
+    O roteador decide sem chamar o LLM; só mensagens ambíguas
+    passam pelo Team leader.
+    """
     user_id = update.effective_user.id
+    session_id = f"telegram_{user_id}"
     
     logger.info(f"[{user_id}] Mensagem: {user_message[:50]}...")
     
     try:
-        # Usa PM Agent diretamente
-        pm = get_pm_agent()
-        
-        logger.info(f"[{user_id}] Chamando PM Agent...")
-        response = pm.run(
-            user_message,
-            session_id=f"telegram_{user_id}",
+        route = get_intent_router().route(
+            user_message, in_conversation=in_pm_conversation(user_id)
         )
+        logger.info(
+            f"[{user_id}] Intenção: {route.intent} "
+            f"(confiança {route.confidence:.2f}, {route.source})"
+        )
+        
+        intent = route.intent
+        set_attribute("intent", intent)
+        set_attribute("intent.confidence", round(route.confidence, 3))
+        # Sem PRD anterior não há o que revisar
+        if intent == PRD_REVISE and user_id not in _last_prd:
+            intent = PRD_GENERATE
         
-        response_text = response.content if hasattr(response, 'content') else str(response)
+        # Mensagem com conteúdo novo invalida o rascunho especulativo do PRD
+        speculator = get_prd_speculator(draft_prd)
+        if speculator and intent in (PM_QA, AMBIGUOUS):
+            speculator.invalidate(session_id)
         
-        logger.info(f"[{user_id}] Resposta: {response_text[:100]}...")
+        # Rascunho feito em background para a versão atual da sessão
+        draft = None
+        if speculator and intent == PRD_GENERATE:
+            draft = await recorder.acall(
+                "speculation", "take", speculator.take, session_id,
+                request={"session_id": session_id},
+            )
+            set_attribute("prd.speculative", draft is not None)
+        
+        # Só os trechos relevantes dos documentos da sessão entram no prompt
+        doc_context = ""
+        if intent != SMALL_TALK and draft is None:
+            with span("documents.search"):
+                doc_context = await recorder.acall(
+                    "documents", "search", get_document_index().context_for,
+                    session_id, user_message,
+                    request={"session_id": session_id, "message": user_message},
+                )
+        # O trace grava o prompt completo (com os trechos), não só a mensagem
+        agent_message = f"{user_message}\n\n{doc_context}" if doc_context else user_message
+        
+        if intent == AMBIGUOUS:
+            logger.info(f"[{user_id}] Chamando Team leader...")
+            with span("team.run"):
+                # Team resolvido dentro da chamada: no replay ele nem é criado
+                response, _ = await run_tiered(
+                    lambda t: recorder.call(
+                        "llm", "team", _team_pool.runner(t.name),
+                        agent_message,
+                        session_id=session_id,
+                        user_id=str(user_id),
+                        request={"prompt": agent_message, "session_id": session_id},
+                        to_record=recorder.run_to_record,
+                        from_record=recorder.run_from_record,
+                    ),
+                    STRONG,
+                    agent="team",
+                    fallback=False,
+                )
+            response_text = _response_text(response)
+        
+        elif draft is not None:
+            logger.info(f"[{user_id}] Usando rascunho especulativo do PRD")
+            response_text = await deliver_prd(update, user_id, draft)
         
-        # Verifica se precisa gerar PRD
-        if "gerar prd" in user_message.lower() or "cria o prd" in user_message.lower():
-            tw = get_tech_writer()
-            prd_response = tw.run(f"Gere um PRD baseado neste contexto:\n\n{response_text}")
-            prd_text = prd_response.content if hasattr(prd_response, 'content') else str(prd_response)
+        elif intent == PRD_REVISE:
+            response_text = await send_prd(
+                update,
+                user_id,
+                f"Revise o PRD abaixo conforme o pedido do CEO.\n\n"
+                f"Pedido: {user_message}\n\nPRD atual:\n\n{_last_prd[user_id]}",
+            )
+        
+        else:
+            # Perguntas repetidas sobre o repo saem do cache (mesmo commit);
+            # mensagens com trechos de documentos da sessão não usam o cache
+            cache = get_answer_cache() if intent == PM_QA and not doc_context else None
+            response_text = None
+            if cache:
+                with span("answer_cache.lookup") as cache_span:
+                    response_text = await recorder.acall(
+                        "cache", "lookup", cache.lookup, user_message,
+                        request={"message": user_message},
+                    )
+                    if cache_span:
+                        cache_span.attributes["hit"] = response_text is not None
+            
+            if response_text is None:
+                # Usa PM Agent diretamente, no tier da intenção; conversa
+                # simples dispensa ferramentas, o resto as mantém no fallback
+                tier = choose_tier(intent)
+                tools = intent != SMALL_TALK
+                
+                logger.info(f"[{user_id}] Chamando PM Agent ({tier})...")
+                with span("pm.run"):
+                    response, _ = await run_tiered(
+                        lambda t: recorder.call(
+                            "llm", "pm", _pm_pool.runner(t.name, tools),
+                            agent_message,
+                            session_id=session_id,
+                            request={"prompt": agent_message, "session_id": session_id},
+                            to_record=recorder.run_to_record,
+                            from_record=recorder.run_from_record,
+                        ),
+                        tier,
+                        agent="pm",
+                    )
+                
+                response_text = _response_text(response)
+                
+                if cache:
+                    # Grava em background para não atrasar a resposta
+                    run_in_background(recorder.acall(
+                        "cache", "store", cache.store, user_message, response_text,
+                        request={"message": user_message},
+                    ))
             
-            # Salva PRD
-            prd_path = save_prd(prd_text, "feature")
-            await update.message.reply_document(
-                document=open(prd_path, 'rb'),
-                filename=prd_path.name,
+            logger.info(f"[{user_id}] Resposta: {response_text[:100]}...")
+            
+            if intent == PRD_GENERATE:
+                response_text = await send_prd(
+                    update,
+                    user_id,
+                    f"Gere um PRD baseado neste contexto:\n\n{response_text}",
+                )
+        
+        if intent == PM_QA:
+            _pm_conversations[user_id] = time.monotonic()
+        elif intent in (PRD_GENERATE, PRD_REVISE):
+            # Demanda fechada: a próxima mensagem começa uma conversa nova,
+            # sem os documentos da anterior (e com o cache de respostas de volta)
+            _pm_conversations.pop(user_id, None)
+            await recorder.acall(
+                "documents", "clear", get_document_index().clear, session_id,
+                request={"session_id": session_id},
             )
-            response_text = "Pronto, gerei o PRD. Dá uma olhada no arquivo."
+        
+        if speculator:
+            if intent in (PM_QA, AMBIGUOUS):
+                speculator.add_turn(session_id, user_message, response_text)
+            elif intent in (PRD_GENERATE, PRD_REVISE):
+                # PRD entregue: a próxima demanda começa do zero
+                speculator.reset(session_id)
+        
+        # Memórias são extraídas em lote quando a sessão ficar ociosa
+        extractor = get_memory_extractor()
+        if extractor and intent != SMALL_TALK:
+            extractor.enqueue(str(user_id), session_id, user_message)
         
         # Responde em áudio
         await send_audio_response(update, response_text)
         
     except Exception as e:
         logger.error(f"[{user_id}] Erro: {e}", exc_info=True)
-        await update.message.reply_text(f"Desculpa, deu um erro aqui: {str(e)[:100]}")
+        with span("telegram.reply_text"):
+            await update.message.reply_text(f"Desculpa, deu um erro aqui: {str(e)[:100]}")
+
+
+async def send_prd(update: Update, user_id: int, prompt: str) -> str:
+    """
+    Gera o PRD com o Tech Writer, salva e envia o arquivo.
+    
+    Returns:
+        str: Mensagem curta para responder ao CEO
+    """
+    with span("tw.run"):
+        prd_response, _ = await run_tiered(
+            lambda t: recorder.call(
+                "llm", "tech_writer", _tech_writer_pool.runner(t.name), prompt,
+                request={"prompt": prompt},
+                to_record=recorder.run_to_record,
+                from_record=recorder.run_from_record,
+            ),
+            STRONG,
+            agent="tech_writer",
+        )
+    return await deliver_prd(update, user_id, _response_text(prd_response))
+
+
+async def deliver_prd(update: Update, user_id: int, prd_text: str) -> str:
+    """
+    Salva e envia um PRD já redigido.
+    
+    Returns:
+        str: Mensagem curta para responder ao CEO
+    """
+    _last_prd[user_id] = prd_text
+    
+    # Salva PRD
+    prd_path = save_prd(prd_text, "feature")
+    with open(prd_path, 'rb') as prd_file, span("telegram.reply_document"):
+        await update.message.reply_document(
+            document=prd_file,
+            filename=prd_path.name,
+        )
+    return "Pronto, gerei o PRD. Dá uma olhada no arquivo."
+
+
+async def draft_prd(prompt: str) -> str:
+    """
+    Redige um PRD especulativo, fora do caminho da resposta.
+    
+    Não passa pelo recorder: o rascunho não é uma chamada do update.
+    """
+    response, _ = await run_tiered(
+        lambda t: _tech_writer_pool.runner(t.name)(prompt),
+        STRONG,
+        agent="tech_writer_draft",
+    )
+    return _response_text(response)
+
+
+def _response_text(response) -> str:
+    """Extrai o texto da resposta de um Agent/Team."""
+    return response.content if hasattr(response, 'content') else str(response)
 
 
 async def send_audio_response(update: Update, text: str) -> None:
     """Envia resposta APENAS em áudio."""
     try:
-        audio_bytes = await text_to_speech(text)
-        await update.message.reply_voice(io.BytesIO(audio_bytes))
+        audio_bytes = await recorder.acall(
+            "tts", "openai", text_to_speech, text,
+            request={"chars": len(text)},
+        )
+        with span("telegram.reply_voice"):
+            await update.message.reply_voice(io.BytesIO(audio_bytes))
     except Exception as e:
         logger.error(f"Erro TTS: {e}")
         # Fallback para texto
-        await update.message.reply_text(text[:2000])
+        with span("telegram.reply_text"):
+            await update.message.reply_text(text[:2000])
 
 
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler para texto."""
-    await process_message(update, update.message.text)
+    request = {"user_id": update.effective_user.id, "text": update.message.text}
+    with root_span("handle_text", user_id=update.effective_user.id), \
+            recorder.record_update("text", request):
+        await process_message(update, update.message.text)
 
 
 async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler para áudio - transcreve silenciosamente."""
+    with root_span("handle_voice", user_id=update.effective_user.id), \
+            recorder.record_update("voice", {"user_id": update.effective_user.id}):
+        await _handle_voice(update)
+
+
+async def _handle_voice(update: Update) -> None:
+    """Baixa, transcreve e processa o áudio."""
     try:
         if update.message.voice:
             file = await update.message.voice.get_file()
@@ -164,8 +429,12 @@ async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         else:
             return
         
-        audio_bytes = await file.download_as_bytearray()
-        transcription = await transcribe_audio_bytes(bytes(audio_bytes), filename)
+        with span("telegram.download"):
+            audio_bytes = await file.download_as_bytearray()
+        transcription = await recorder.acall(
+            "transcription", "whisper", transcribe_audio_bytes, bytes(audio_bytes), filename,
+            request={"filename": filename, "bytes": len(audio_bytes)},
+        )
         
         logger.info(f"Transcrição: {transcription[:50]}...")
         
@@ -176,6 +445,64 @@ async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         await update.message.reply_text("Não consegui entender o áudio. Pode repetir?")
 
 
+async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler para documentos (PDF, markdown, specs)."""
+    document = update.message.document
+    request = {
+        "user_id": update.effective_user.id,
+        "file_name": document.file_name,
+        "file_size": document.file_size,
+    }
+    with root_span("handle_document", user_id=update.effective_user.id), \
+            recorder.record_update("document", request):
+        await _handle_document(update)
+
+
+async def _handle_document(update: Update) -> None:
+    """Baixa em streaming, indexa e, se houver legenda, processa como mensagem."""
+    user_id = update.effective_user.id
+    session_id = f"telegram_{user_id}"
+    document = update.message.document
+    filename = Path(document.file_name or "documento.txt").name
+    
+    if document.file_size and document.file_size > settings.DOCUMENT_MAX_BYTES:
+        await update.message.reply_text("Esse documento é grande demais pra mim. Consegue mandar uma versão menor?")
+        return
+    
+    try:
+        file = await document.get_file()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / filename
+            with span("telegram.download"):
+                await download_to_disk(file, path)
+            with span("documents.ingest"):
+                chunks = await get_document_index().ingest(session_id, filename, path)
+    except DocumentError as e:
+        logger.warning(f"[{user_id}] Documento recusado: {e}")
+        await update.message.reply_text(f"Não consegui ler esse documento: {e}")
+        return
+    except Exception as e:
+        logger.error(f"[{user_id}] Erro documento: {e}", exc_info=True)
+        await update.message.reply_text("Não consegui processar o documento. Pode tentar de novo?")
+        return
+    
+    logger.info(f"[{user_id}] Documento {filename}: {chunks} trechos")
+    
+    # Documento novo muda o contexto do rascunho do PRD
+    speculator = get_prd_speculator(draft_prd)
+    if speculator:
+        speculator.invalidate(session_id)
+    
+    # A legenda do documento é a mensagem do CEO sobre ele
+    if update.message.caption:
+        await process_message(update, update.message.caption)
+    else:
+        await send_audio_response(
+            update,
+            f"Recebi o {filename}. Vou usar ele como referência na nossa conversa.",
+        )
+
+
 # ============================================
 # INICIALIZAÇÃO
 # ============================================
@@ -188,14 +515,28 @@ def run_bot() -> None:
     logger.info("Iniciando bot...")
     logger.info(f"  Repo: {settings.GITHUB_REPO}")
     
+    # Mantém o digest do repositório atualizado em background
+    start_digest_watcher()
+    
+    # Extração de memórias em lote (modo deferred)
+    extractor = get_memory_extractor()
+    if extractor:
+        extractor.start()
+    
     app = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
     
     app.add_handler(CommandHandler("start", start_command))
+    app.add_handler(CommandHandler("metricas", metrics_command))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text))
     app.add_handler(MessageHandler(filters.VOICE | filters.AUDIO, handle_voice))
+    app.add_handler(MessageHandler(filters.Document.ALL, handle_document))
     
     logger.info("Bot rodando!")
     app.run_polling(allowed_updates=Update.ALL_TYPES)
+    
+    # Processa o que ficou na fila antes de sair
+    if extractor:
+        extractor.stop()
 
 
 if __name__ == "__main__":
@@ -46,6 +46,71 @@ class Settings:
     # Modelo LLM
     MODEL_ID: str = os.getenv("MODEL_ID", "gpt-4o-mini")
     
+    # Cascata de modelos: "fast" para conversa simples, "strong" para ferramentas e PRDs
+    MODEL_FAST_ID: str = os.getenv("MODEL_FAST_ID", "gpt-4o-mini")
+    MODEL_STRONG_ID: str = os.getenv("MODEL_STRONG_ID", MODEL_ID)
+    # Orçamento de latência por tier (segundos); estourou, troca de tier
+    MODEL_FAST_TIMEOUT: float = float(os.getenv("MODEL_FAST_TIMEOUT", "20"))
+    MODEL_STRONG_TIMEOUT: float = float(os.getenv("MODEL_STRONG_TIMEOUT", "90"))
+    
+    # Embeddings (cache semântico)
+    EMBEDDING_MODEL_ID: str = os.getenv("EMBEDDING_MODEL_ID", "text-embedding-3-small")
+    
+    # Cache de respostas do PM (chave: pergunta normalizada + HEAD do repo)
+    ANSWER_CACHE_ENABLED: bool = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_THRESHOLD: float = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+    ANSWER_CACHE_PATH: str = str(DATA_DIR / "answer_cache.db")
+    # Por quanto tempo (segundos) reaproveitar o SHA do HEAD antes de consultar o GitHub
+    GITHUB_HEAD_TTL: int = int(os.getenv("GITHUB_HEAD_TTL", "60"))
+    
+    # Roteador de intenções (abaixo do limiar, a mensagem vai para o Team leader)
+    INTENT_MIN_CONFIDENCE: float = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.6"))
+    INTENT_EXAMPLES_PATH: str = str(DATA_DIR / "intent_examples.jsonl")
+    # Sem turno com o PM por este tempo (segundos), a conversa é dada como encerrada
+    PM_CONVERSATION_IDLE_SECONDS: int = int(os.getenv("PM_CONVERSATION_IDLE_SECONDS", "1800"))
+    
+    # Digest do repositório (resumo por commit injetado nas instruções do PM)
+    REPO_DIGEST_ENABLED: bool = os.getenv("REPO_DIGEST_ENABLED", "true").lower() == "true"
+    REPO_DIGEST_PATH: str = str(DATA_DIR / "repo_digest.json")
+    REPO_DIGEST_POLL_SECONDS: int = int(os.getenv("REPO_DIGEST_POLL_SECONDS", "300"))
+    REPO_DIGEST_MAX_FILES: int = int(os.getenv("REPO_DIGEST_MAX_FILES", "300"))
+    REPO_DIGEST_MAX_CHARS: int = int(os.getenv("REPO_DIGEST_MAX_CHARS", "12000"))
+    
+    # Memórias do usuário: "inline" (a cada turno) ou "deferred" (em lote, fora do turno)
+    MEMORY_EXTRACTION_MODE: str = os.getenv("MEMORY_EXTRACTION_MODE", "deferred")
+    # Extrai quando a sessão fica ociosa por este tempo (segundos)
+    MEMORY_IDLE_SECONDS: int = int(os.getenv("MEMORY_IDLE_SECONDS", "300"))
+    # ...ou quando há turnos esperando há mais que isso (sessões longas)
+    MEMORY_FLUSH_INTERVAL_SECONDS: int = int(os.getenv("MEMORY_FLUSH_INTERVAL_SECONDS", "1800"))
+    
+    # Gravação de traces das conversas (opt-in), para replay e comparação de latência
+    TRACE_RECORDING: bool = os.getenv("TRACE_RECORDING", "false").lower() == "true"
+    TRACE_DIR: Path = DATA_DIR / "traces"
+    
+    # Spans por update (fração amostrada; 0 desliga) e formatos exportados
+    SPAN_SAMPLE_RATE: float = float(os.getenv("SPAN_SAMPLE_RATE", "0"))
+    SPAN_EXPORT_FORMATS: list[str] = [
+        f.strip() for f in os.getenv("SPAN_EXPORT_FORMATS", "chrome,otlp").split(",") if f.strip()
+    ]
+    
+    # Documentos enviados no Telegram (indexados por sessão)
+    DOCUMENTS_PATH: str = str(DATA_DIR / "documents.db")
+    DOCUMENT_MAX_BYTES: int = int(os.getenv("DOCUMENT_MAX_BYTES", str(20 * 1024 * 1024)))
+    DOCUMENT_CHUNK_CHARS: int = int(os.getenv("DOCUMENT_CHUNK_CHARS", "1500"))
+    DOCUMENT_CHUNK_OVERLAP: int = int(os.getenv("DOCUMENT_CHUNK_OVERLAP", "200"))
+    DOCUMENT_MAX_CHUNKS: int = int(os.getenv("DOCUMENT_MAX_CHUNKS", "400"))
+    DOCUMENT_TOP_K: int = int(os.getenv("DOCUMENT_TOP_K", "4"))
+    # Similaridade mínima para um trecho entrar no prompt
+    DOCUMENT_MIN_SCORE: float = float(os.getenv("DOCUMENT_MIN_SCORE", "0.35"))
+    
+    # Rascunho especulativo do PRD quando a sessão cobre prazo, prioridade e impacto
+    PRD_SPECULATION_ENABLED: bool = os.getenv("PRD_SPECULATION_ENABLED", "true").lower() == "true"
+    # Espera (segundos) após a resposta antes de começar o rascunho
+    PRD_SPECULATION_DELAY_SECONDS: float = float(os.getenv("PRD_SPECULATION_DELAY_SECONDS", "3"))
+    PRD_SPECULATION_MAX_TURNS: int = int(os.getenv("PRD_SPECULATION_MAX_TURNS", "20"))
+    # Intervalo mínimo (segundos) entre rascunhos da mesma sessão
+    PRD_SPECULATION_COOLDOWN_SECONDS: float = float(os.getenv("PRD_SPECULATION_COOLDOWN_SECONDS", "120"))
+    
     # Caminhos
     SQLITE_PATH: str = str(DATA_DIR / "memory.db")
     PRD_OUTPUT_DIR: Path = OUTPUT_DIR
@@ -64,7 +64,7 @@ def main():
         sys.exit(1)
     
     logger.info("✅ Configurações OK")
-    logger.info(f"   Modelo: {settings.MODEL_ID}")
+    logger.info(f"   Modelos: {settings.MODEL_STRONG_ID} (forte) | {settings.MODEL_FAST_ID} (rápido)")
     logger.info(f"   Repo: {settings.GITHUB_REPO or 'Não configurado'}")
     logger.info(f"   PRDs: {settings.PRD_OUTPUT_DIR}")
     
@@ -0,0 +1 @@
+"""Módulo de observabilidade do sistema."""
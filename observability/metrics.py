@@ -0,0 +1,87 @@
+"""
+Metrics - Contadores e latências em memória do processo.
+
+Métricas simples, com rótulos, para decisões que precisam ser
+acompanhadas em produção (ex.: roteamento entre modelos).
+
+USO:
+    from observability import metrics
+
+    metrics.increment("model.route", agent="pm", tier="fast")
+    metrics.observe("model.latency", 1.42, agent="pm", tier="fast")
+    print(metrics.format_report())
+"""
+
+import statistics
+import threading
+from collections import Counter, defaultdict, deque
+
+
+# Quantas observações recentes guardar por série
+MAX_OBSERVATIONS = 1000
+
+_counters: Counter = Counter()
+_observations: dict[tuple, deque] = defaultdict(lambda: deque(maxlen=MAX_OBSERVATIONS))
+_lock = threading.Lock()
+
+
+def _key(name: str, labels: dict) -> tuple:
+    """Chave da série: nome + rótulos ordenados."""
+    return (name, tuple(sorted(labels.items())))
+
+
+def increment(name: str, value: int = 1, **labels) -> None:
+    """Soma `value` ao contador."""
+    with _lock:
+        _counters[_key(name, labels)] += value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Registra uma observação (ex.: latência em segundos)."""
+    with _lock:
+        _observations[_key(name, labels)].append(value)
+
+
+def snapshot() -> dict:
+    """
+    Retorna os valores atuais.
+
+    Returns:
+        dict: {"counters": {série: valor}, "observations": {série: resumo}}
+    """
+    def label(key: tuple) -> str:
+        name, labels = key
+        if not labels:
+            return name
+        return f"{name}{{{','.join(f'{k}={v}' for k, v in labels)}}}"
+
+    with _lock:
+        counters = {label(k): v for k, v in sorted(_counters.items())}
+        observations = {}
+        for k, values in sorted(_observations.items()):
+            if not values:
+                continue
+            ordered = sorted(values)
+            observations[label(k)] = {
+                "count": len(ordered),
+                "mean": statistics.mean(ordered),
+                "p50": statistics.median(ordered),
+                "max": ordered[-1],
+            }
+    return {"counters": counters, "observations": observations}
+
+
+def format_report() -> str:
+    """Relatório em texto das métricas atuais."""
+    data = snapshot()
+    lines = ["📊 Métricas"]
+    for name, value in data["counters"].items():
+        lines.append(f"- {name}: {value}")
+    for name, summary in data["observations"].items():
+        lines.append(
+            f"- {name}: n={summary['count']} média={summary['mean']:.2f}s "
+            f"p50={summary['p50']:.2f}s máx={summary['max']:.2f}s"
+        )
+    if len(lines) == 1:
+        lines.append("- (sem dados ainda)")
+    return "\n".join(lines)
@@ -0,0 +1,363 @@
+"""
+Trace Recorder - Gravação de conversas para replay determinístico.
+
+Quando TRACE_RECORDING=true, cada chamada externa de um turno vira um
+evento num arquivo JSONL compacto (data/traces/trace_<timestamp>.jsonl):
+
+    - telegram_update: a mensagem recebida (evento pai do turno)
+    - transcription: Whisper
+    - llm: runs do PM, Tech Writer e Team (entrada, resposta, tokens)
+    - github: ferramentas chamadas pelo PM
+    - tts: síntese de voz
+    - cache: consultas ao cache de respostas
+
+Cada evento guarda o início (relativo ao trace), a duração, o payload
+e o evento pai. O mesmo ponto de interceptação (`call`/`acall`) serve
+ao replay: com um Player ativo, a chamada real não acontece e a
+resposta gravada é devolvida, com a duração original (ou comprimida).
+
+USO:
+    from observability import recorder
+
+    with recorder.record_update("text", {"user_id": 1, "text": "oi"}):
+        response = recorder.call("llm", "pm", pm.run, "oi", request={"message": "oi"})
+
+    # Replay: ver observability.replay
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayMismatch(RuntimeError):
+    """A versão atual fez uma chamada que não existe na gravação."""
+
+
+class Recorder:
+    """Grava eventos num arquivo JSONL (um por processo)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._t0 = time.monotonic()
+
+    def next_seq(self) -> int:
+        """Reserva o número de sequência de um novo evento."""
+        with self._lock:
+            self._seq += 1
+            return self._seq
+
+    def offset(self) -> float:
+        """Segundos desde o início do trace."""
+        return time.monotonic() - self._t0
+
+    def write(self, event: dict) -> None:
+        """Grava um evento já finalizado."""
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+
+class Player:
+    """
+    Devolve respostas gravadas no lugar das chamadas reais.
+
+    As respostas são casadas por (evento pai, kind, name), na ordem
+    em que foram gravadas. Assim chamadas concorrentes (ex.: tarefas
+    em background) não dependem da intercalação.
+    """
+
+    def __init__(self, events: list[dict], speed: float = 1.0):
+        self.speed = speed
+        self.events = {e["seq"]: e for e in events}
+        self.children: dict[int | None, list[dict]] = defaultdict(list)
+        self._queues: dict[tuple, deque] = defaultdict(deque)
+        for event in sorted(events, key=lambda e: e["start"]):
+            self.children[event.get("parent")].append(event)
+            self._queues[(event.get("parent"), event["kind"], event["name"])].append(event)
+        self.consumed: list[dict] = []
+        self.misses: list[tuple[str, str]] = []
+
+    def updates(self) -> list[dict]:
+        """Eventos telegram_update de topo, em ordem de início."""
+        return [e for e in self.children[None] if e["kind"] == "telegram_update"]
+
+    def take(self, parent: int | None, kind: str, name: str) -> dict:
+        """Consome o próximo evento gravado para a chamada."""
+        queue = self._queues.get((parent, kind, name))
+        if not queue:
+            self.misses.append((kind, name))
+            raise ReplayMismatch(f"Chamada sem gravação: {kind}/{name}")
+        event = queue.popleft()
+        self.consumed.append(event)
+        return event
+
+    def subtree(self, seq: int) -> list[dict]:
+        """Todos os descendentes de um evento."""
+        result = []
+        stack = list(self.children.get(seq, []))
+        while stack:
+            event = stack.pop()
+            result.append(event)
+            stack.extend(self.children.get(event["seq"], []))
+        return result
+
+
+# Gravador do processo (criado sob demanda se TRACE_RECORDING=true)
+_recorder: Recorder | None = None
+_recorder_lock = threading.Lock()
+
+# Evento pai da chamada atual e player de replay (propagados por contexto)
+_parent: ContextVar[int | None] = ContextVar("trace_parent", default=None)
+_player: ContextVar[Player | None] = ContextVar("trace_player", default=None)
+
+
+def get_recorder() -> Recorder | None:
+    """Retorna o gravador, ou None se a gravação estiver desligada."""
+    global _recorder
+    if not settings.TRACE_RECORDING:
+        return None
+    with _recorder_lock:
+        if _recorder is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            _recorder = Recorder(settings.TRACE_DIR / f"trace_{timestamp}.jsonl")
+            logger.info(f"Gravando traces em {_recorder.path}")
+    return _recorder
+
+
+def is_active() -> bool:
+    """Indica se há gravação ou replay em andamento."""
+    return _player.get() is not None or get_recorder() is not None
+
+
+def is_replaying() -> bool:
+    """Indica se o contexto atual está em replay."""
+    return _player.get() is not None
+
+
+def _default_to_record(value: Any) -> Any:
+    """Serializa respostas simples; bytes viram só o tamanho."""
+    if isinstance(value, (bytes, bytearray)):
+        return {"bytes": len(value)}
+    return value
+
+
+def _default_from_record(value: Any) -> Any:
+    """Reconstrói respostas simples gravadas por _default_to_record."""
+    if isinstance(value, dict) and set(value) == {"bytes"}:
+        return bytes(value["bytes"])
+    return value
+
+
+def run_to_record(response: Any) -> dict:
+    """Serializa a resposta de um Agent/Team (texto, modelo, tokens, ferramentas)."""
+    metrics = getattr(response, "metrics", None)
+    tools = getattr(response, "tools", None) or []
+    return {
+        "content": response.content if hasattr(response, "content") else str(response),
+        "model": getattr(response, "model", None),
+        "input_tokens": getattr(metrics, "input_tokens", None),
+        "output_tokens": getattr(metrics, "output_tokens", None),
+        "tools": [getattr(t, "tool_name", None) for t in tools],
+    }
+
+
+def run_from_record(data: dict) -> SimpleNamespace:
+    """Reconstrói a resposta de um Agent/Team gravada por run_to_record."""
+    return SimpleNamespace(**data)
+
+
+class _Call:
+    """Estado de uma chamada interceptada (gravação ou replay)."""
+
+    def __init__(self, kind: str, name: str, request: Any):
+        self.kind = kind
+        self.name = name
+        self.request = request
+        self.recorder = get_recorder()
+        self.player = _player.get()
+        self.parent = _parent.get()
+        self.event: dict | None = None
+        self.seq: int | None = None
+        self.start = 0.0
+
+    def begin(self) -> None:
+        if self.player is not None:
+            self.event = self.player.take(self.parent, self.kind, self.name)
+            self.seq = self.event["seq"]
+        elif self.recorder is not None:
+            self.seq = self.recorder.next_seq()
+            self.start = self.recorder.offset()
+
+    def replay_delay(self) -> float:
+        return self.event.get("duration", 0) * self.player.speed
+
+    def replay_result(self, from_record: Callable) -> Any:
+        if self.event.get("error"):
+            raise RuntimeError(self.event["error"])
+        return from_record(self.event.get("response"))
+
+    def finish(self, response: Any = None, error: BaseException | None = None) -> None:
+        if self.recorder is None or self.player is not None:
+            return
+        self.recorder.write({
+            "seq": self.seq,
+            "parent": self.parent,
+            "kind": self.kind,
+            "name": self.name,
+            "start": round(self.start, 4),
+            "duration": round(self.recorder.offset() - self.start, 4),
+            "request": self.request,
+            "response": response,
+            "error": f"{type(error).__name__}: {error}" if error else None,
+        })
+
+
+def call(
+    kind: str,
+    name: str,
+    fn: Callable,
+    *args,
+    request: Any = None,
+    to_record: Callable = _default_to_record,
+    from_record: Callable = _default_from_record,
+    **kwargs,
+) -> Any:
+    """
+    Executa uma chamada síncrona, gravando-a ou reproduzindo-a.
+
+    Sem gravação nem replay, apenas chama fn(*args, **kwargs).
+    """
+    if not is_active():
+        return fn(*args, **kwargs)
+
+    c = _Call(kind, name, request)
+    c.begin()
+    if c.player is not None:
+        time.sleep(c.replay_delay())
+        return c.replay_result(from_record)
+
+    token = _parent.set(c.seq)
+    try:
+        result = fn(*args, **kwargs)
+    except BaseException as e:
+        c.finish(error=e)
+        raise
+    finally:
+        _parent.reset(token)
+    c.finish(response=to_record(result))
+    return result
+
+
+async def acall(
+    kind: str,
+    name: str,
+    fn: Callable,
+    *args,
+    request: Any = None,
+    to_record: Callable = _default_to_record,
+    from_record: Callable = _default_from_record,
+    **kwargs,
+) -> Any:
+    """Versão assíncrona de `call` (fn é uma corrotina)."""
+    if not is_active():
+        return await fn(*args, **kwargs)
+
+    c = _Call(kind, name, request)
+    c.begin()
+    if c.player is not None:
+        await asyncio.sleep(c.replay_delay())
+        return c.replay_result(from_record)
+
+    token = _parent.set(c.seq)
+    try:
+        result = await fn(*args, **kwargs)
+    except BaseException as e:
+        c.finish(error=e)
+        raise
+    finally:
+        _parent.reset(token)
+    c.finish(response=to_record(result))
+    return result
+
+
+@contextlib.contextmanager
+def record_update(name: str, request: dict):
+    """
+    Marca o início de um turno (update do Telegram).
+
+    As chamadas feitas dentro do bloco ficam como filhas deste evento.
+    No replay, o runner define o pai diretamente (ver `replaying`).
+    """
+    recorder = get_recorder()
+    if recorder is None or _player.get() is not None:
+        yield
+        return
+
+    c = _Call("telegram_update", name, request)
+    c.begin()
+    token = _parent.set(c.seq)
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _parent.reset(token)
+        c.finish(error=error)
+
+
+@contextlib.contextmanager
+def replaying(player: Player, update_seq: int):
+    """Ativa o replay das chamadas filhas de um update gravado."""
+    player_token = _player.set(player)
+    parent_token = _parent.set(update_seq)
+    try:
+        yield
+    finally:
+        _parent.reset(parent_token)
+        _player.reset(player_token)
+
+
+def tool_hook(function_name: str, function_call: Callable, arguments: dict[str, Any]) -> Any:
+    """
+    Hook de ferramentas do agno: grava cada chamada de ferramenta do PM.
+
+    Registrado via `Agent(tool_hooks=[tool_hook])`.
+    """
+    return call(
+        "github",
+        function_name,
+        lambda: function_call(**arguments),
+        request=arguments,
+        to_record=lambda result: str(result)[:2000],
+    )
+
+
+def load_trace(path: str | Path) -> list[dict]:
+    """Carrega os eventos de um arquivo de trace."""
+    events = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            events.append(json.loads(line))
+    return events
@@ -0,0 +1,185 @@
+"""
+Trace Replay - Reexecuta conversas gravadas contra as respostas gravadas.
+
+Cada telegram_update do trace passa de novo pelo `process_message` da
+versão atual do bot. Chamadas externas (LLM, Whisper, GitHub, TTS,
+cache) não saem da máquina: o recorder devolve a resposta gravada,
+esperando a duração original multiplicada por --speed.
+
+Assim dá para comparar, entre versões do bot e dos agentes:
+    - latência de cada turno (gravada x replay)
+    - quantidade de chamadas por tipo (llm, github, tts, ...)
+    - chamadas novas que a gravação não cobre (mismatches)
+
+USO:
+    # Timing original
+    uv run python -m observability.replay data/traces/trace_20251218_155947.jsonl
+
+    # Timing comprimido (10x mais rápido) ou sem espera
+    uv run python -m observability.replay data/traces/trace_X.jsonl --speed 0.1
+    uv run python -m observability.replay data/traces/trace_X.jsonl --speed 0
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+
+from config import settings
+from observability import recorder
+
+
+class ReplayMessage:
+    """Mensagem falsa do Telegram: conta as respostas em vez de enviá-las."""
+
+    def __init__(self):
+        self.replies: Counter = Counter()
+        # Texto das respostas em texto (erros e fallbacks do bot)
+        self.texts: list[str] = []
+
+    async def reply_text(self, text, *args, **kwargs):
+        self.replies["text"] += 1
+        self.texts.append(str(text))
+
+    async def reply_voice(self, voice, *args, **kwargs):
+        self.replies["voice"] += 1
+
+    async def reply_document(self, document, *args, **kwargs):
+        self.replies["document"] += 1
+
+
+def _count_by_kind(events: list[dict]) -> Counter:
+    """Conta eventos por tipo."""
+    return Counter(e["kind"] for e in events)
+
+
+async def replay_update(player: recorder.Player, event: dict) -> dict:
+    """
+    Reexecuta um update gravado e retorna as métricas do turno.
+
+    Returns:
+        dict: Latência gravada/replay, chamadas por tipo e respostas enviadas
+    """
+    # Import local: o bot carrega agentes e clientes na importação
+    from bot.telegram_bot import process_message
+
+    request = event.get("request") or {}
+    message = ReplayMessage()
+    update = SimpleNamespace(
+        effective_user=SimpleNamespace(id=request.get("user_id", 0)),
+        message=message,
+    )
+
+    consumed_before = len(player.consumed)
+    misses_before = len(player.misses)
+    start = time.monotonic()
+
+    with recorder.replaying(player, event["seq"]):
+        text = request.get("text")
+        if event["name"] == "voice":
+            text = await recorder.acall(
+                "transcription", "whisper", None, request=request
+            )
+        await process_message(update, text)
+
+    # Chamadas reproduzidas + as chamadas aninhadas dentro delas
+    replayed = list(player.consumed[consumed_before:])
+    for consumed in list(replayed):
+        replayed.extend(player.subtree(consumed["seq"]))
+
+    return {
+        "text": (text or "")[:40],
+        "recorded_latency": event.get("duration", 0),
+        "replay_latency": time.monotonic() - start,
+        "recorded_calls": _count_by_kind(player.subtree(event["seq"])),
+        "replayed_calls": _count_by_kind(replayed),
+        "misses": player.misses[misses_before:],
+        "replies": dict(message.replies),
+        "reply_texts": message.texts,
+    }
+
+
+async def replay_trace(path: str, speed: float = 1.0) -> list[dict]:
+    """
+    Reexecuta todos os updates de um trace, na ordem original.
+
+    O intervalo entre updates também é respeitado (× speed). Os PRDs
+    gerados no replay vão para um diretório temporário.
+    """
+    settings.TRACE_RECORDING = False
+    settings.PRD_OUTPUT_DIR = Path(tempfile.mkdtemp(prefix="replay_prd_"))
+
+    player = recorder.Player(recorder.load_trace(path), speed=speed)
+    results = []
+    t0 = time.monotonic()
+    first_start = None
+
+    for event in player.updates():
+        # Documentos mudam o índice local; as buscas já estão gravadas
+        if event["name"] not in ("text", "voice"):
+            continue
+        if first_start is None:
+            first_start = event["start"]
+        # Espera o mesmo intervalo da gravação até o próximo update
+        wait = (event["start"] - first_start) * speed - (time.monotonic() - t0)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        results.append(await replay_update(player, event))
+
+    return results
+
+
+def print_report(results: list[dict]) -> None:
+    """Imprime a comparação gravado x replay por turno e no total."""
+    total_recorded, total_replay = 0.0, 0.0
+    calls_recorded, calls_replayed = Counter(), Counter()
+    total_misses = 0
+    total_text_replies = 0
+
+    for i, r in enumerate(results, 1):
+        total_recorded += r["recorded_latency"]
+        total_replay += r["replay_latency"]
+        calls_recorded += r["recorded_calls"]
+        calls_replayed += r["replayed_calls"]
+        total_misses += len(r["misses"])
+        total_text_replies += len(r["reply_texts"])
+
+        print(f"#{i} {r['text']!r}")
+        print(f"   latência: gravada {r['recorded_latency']:.2f}s | replay {r['replay_latency']:.2f}s")
+        print(f"   chamadas: gravadas {dict(r['recorded_calls'])} | replay {dict(r['replayed_calls'])}")
+        print(f"   respostas: {r['replies']}")
+        for text in r["reply_texts"]:
+            # Resposta em texto = erro ou fallback: o turno não foi como gravado
+            print(f"   ⚠️  texto: {text[:200]!r}")
+        if r["misses"]:
+            print(f"   ⚠️  sem gravação: {r['misses']}")
+
+    print()
+    print(f"📊 {len(results)} turnos")
+    print(f"   Latência total: gravada {total_recorded:.2f}s | replay {total_replay:.2f}s")
+    print(f"   Chamadas: gravadas {dict(calls_recorded)} | replay {dict(calls_replayed)}")
+    print(f"   Mismatches: {total_misses}")
+    print(f"   Respostas em texto (erros/fallbacks): {total_text_replies}")
+
+
+def main() -> None:
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description="Replay de traces gravados do bot")
+    parser.add_argument("trace", help="Arquivo de trace (.jsonl)")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Multiplicador das durações gravadas (1 = original, 0 = sem espera)",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(replay_trace(args.trace, args.speed))
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Spans - Tracing por update com exportação para Chrome trace / OTLP.
+
+Cada update do Telegram abre um span raiz; as etapas internas
+(transcrição, pm.run e suas ferramentas, tw.run, save_prd, TTS,
+respostas do Telegram) viram spans filhos. O span atual é propagado
+por ContextVar, então funciona em corrotinas e em `asyncio.to_thread`.
+
+AMOSTRAGEM:
+    SPAN_SAMPLE_RATE (0 a 1) define a fração de updates rastreados.
+    Fora da amostra, `span()` não faz nada (custo desprezível).
+
+EXPORTAÇÃO (data/traces/spans/):
+    - <timestamp>_<trace_id>.trace.json: formato Chrome trace
+      (abrir em chrome://tracing, Perfetto ou speedscope)
+    - <timestamp>_<trace_id>.otlp.json: OTLP/JSON (resourceSpans)
+
+USO:
+    from observability.spans import root_span, span, traced
+
+    with root_span("handle_text", user_id=123):
+        with span("pm.run"):
+            ...
+
+    @traced("text_to_speech")
+    async def text_to_speech(text): ...
+"""
+
+import contextlib
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Nome do serviço nos arquivos exportados
+SERVICE_NAME = "agente-whind"
+
+
+@dataclass
+class Span:
+    """Um intervalo de tempo nomeado dentro de um trace."""
+
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    start_ns: int
+    attributes: dict[str, Any] = field(default_factory=dict)
+    end_ns: int | None = None
+    thread_id: int = field(default_factory=threading.get_ident)
+    error: str | None = None
+
+
+class TraceBuffer:
+    """Spans finalizados de um trace (um update)."""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+# Span atual e trace amostrado (propagados por contexto)
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_buffer: ContextVar[TraceBuffer | None] = ContextVar("trace_buffer", default=None)
+
+
+def _new_id(n_bytes: int) -> str:
+    """ID hexadecimal aleatório (16 bytes para trace, 8 para span)."""
+    return os.urandom(n_bytes).hex()
+
+
+def current_span() -> Span | None:
+    """Retorna o span ativo (ou None fora de um trace amostrado)."""
+    return _current.get()
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Adiciona um atributo ao span ativo, se houver."""
+    active = _current.get()
+    if active is not None:
+        active.attributes[key] = value
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """
+    Abre um span filho do span atual.
+
+    Fora de um trace amostrado, não faz nada.
+    """
+    buffer = _buffer.get()
+    if buffer is None:
+        yield None
+        return
+
+    parent = _current.get()
+    s = Span(
+        trace_id=buffer.trace_id,
+        span_id=_new_id(8),
+        parent_id=parent.span_id if parent else None,
+        name=name,
+        start_ns=time.time_ns(),
+        attributes=attributes,
+    )
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current.reset(token)
+        buffer.add(s)
+
+
+@contextlib.contextmanager
+def root_span(name: str, **attributes):
+    """
+    Abre o span raiz de um update, sujeito à amostragem.
+
+    Ao sair, exporta o trace para data/traces/spans/.
+    """
+    if _buffer.get() is not None or random.random() >= settings.SPAN_SAMPLE_RATE:
+        with span(name, **attributes) as s:
+            yield s
+        return
+
+    buffer = TraceBuffer(_new_id(16))
+    buffer_token = _buffer.set(buffer)
+    try:
+        with span(name, **attributes) as s:
+            yield s
+    finally:
+        _buffer.reset(buffer_token)
+        try:
+            export(buffer)
+        except Exception as e:
+            logger.warning(f"Não consegui exportar o trace {buffer.trace_id}: {e}")
+
+
+def traced(name: str | None = None):
+    """
+    Decorator que envolve a função (sync ou async) num span.
+
+    Example:
+        >>> @traced("save_prd")
+        ... def save_prd(content, feature_name): ...
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def tool_hook(function_name: str, function_call: Callable, arguments: dict[str, Any]) -> Any:
+    """
+    Hook de ferramentas do agno: cada chamada de ferramenta vira um span.
+
+    Registrado via `Agent(tool_hooks=[tool_hook])`.
+    """
+    with span(f"tool.{function_name}", arguments=str(arguments)[:200]):
+        return function_call(**arguments)
+
+
+def to_chrome_trace(buffer: TraceBuffer) -> dict:
+    """Converte os spans para o formato Chrome trace (eventos "X")."""
+    pid = os.getpid()
+    events = []
+    for s in sorted(buffer.spans, key=lambda s: s.start_ns):
+        args = {k: str(v) for k, v in s.attributes.items()}
+        args.update(span_id=s.span_id, parent_id=s.parent_id or "")
+        if s.error:
+            args["error"] = s.error
+        events.append({
+            "name": s.name,
+            "cat": s.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": s.start_ns / 1000,
+            "dur": ((s.end_ns or s.start_ns) - s.start_ns) / 1000,
+            "pid": pid,
+            "tid": s.thread_id,
+            "args": args,
+        })
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"service": SERVICE_NAME, "trace_id": buffer.trace_id},
+    }
+
+
+def _otlp_value(value: Any) -> dict:
+    """Converte um atributo para AnyValue do OTLP/JSON."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(buffer: TraceBuffer) -> dict:
+    """Converte os spans para OTLP/JSON (ExportTraceServiceRequest)."""
+    spans = []
+    for s in buffer.spans:
+        item = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": [
+                {"key": k, "value": _otlp_value(v)}
+                for k, v in {**s.attributes, "thread.id": s.thread_id}.items()
+            ],
+            # STATUS_CODE_OK = 1, STATUS_CODE_ERROR = 2
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        spans.append(item)
+
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+            },
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
+
+
+def export(buffer: TraceBuffer) -> None:
+    """Grava o trace nos formatos configurados em SPAN_EXPORT_FORMATS."""
+    if not buffer.spans:
+        return
+
+    out_dir = settings.TRACE_DIR / "spans"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    prefix = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{buffer.trace_id[:12]}"
+
+    exporters = {"chrome": ("trace.json", to_chrome_trace), "otlp": ("otlp.json", to_otlp)}
+    for fmt in settings.SPAN_EXPORT_FORMATS:
+        if fmt not in exporters:
+            continue
+        suffix, convert = exporters[fmt]
+        path = out_dir / f"{prefix}.{suffix}"
+        path.write_text(json.dumps(convert(buffer), ensure_ascii=False), encoding="utf-8")
+
+    logger.info(f"Trace {buffer.trace_id[:12]} exportado ({len(buffer.spans)} spans)")
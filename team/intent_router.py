@@ -0,0 +1,360 @@
+"""
+Intent Router - Roteamento local de mensagens, sem chamada ao LLM.
+
+Este módulo decide para onde vai cada mensagem do CEO:
+    - pm_qa: pergunta/demanda para o PM (análise do repositório)
+    - prd_generate: gerar o PRD a partir da conversa
+    - prd_revise: ajustar o último PRD gerado
+    - small_talk: cumprimentos, agradecimentos, confirmações
+
+COMO DECIDE:
+    1. Regras (regex) para os casos óbvios → confiança alta
+    2. Classificador Naive Bayes local, treinado com exemplos
+       semente + transcrições rotuladas (data/intent_examples.jsonl)
+    3. Se a confiança ficar abaixo de INTENT_MIN_CONFIDENCE:
+       - no meio de uma conversa com o PM, é resposta/continuação → pm_qa
+       - sem conversa em andamento, é ambígua → Team leader (LLM)
+
+TREINO COM AS TRANSCRIÇÕES:
+    # Exporta mensagens das sessões (data/memory.db) com o rótulo
+    # previsto, para revisão manual
+    uv run python -m team.intent_router export
+
+    # Mostra a acurácia do classificador nos exemplos rotulados
+    uv run python -m team.intent_router
+
+USO:
+    from team.intent_router import get_intent_router
+
+    result = get_intent_router().route("gerar prd")
+    print(result.intent, result.confidence, result.source)
+"""
+
+import json
+import math
+import re
+import sqlite3
+import sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from config import settings
+from tools.text import normalize_text
+
+
+# Intenções suportadas
+PM_QA = "pm_qa"
+PRD_GENERATE = "prd_generate"
+PRD_REVISE = "prd_revise"
+SMALL_TALK = "small_talk"
+INTENTS = (PM_QA, PRD_GENERATE, PRD_REVISE, SMALL_TALK)
+
+# Intenção retornada quando a mensagem é ambígua (vai para o Team leader)
+AMBIGUOUS = "ambiguous"
+
+# Regras aplicadas em ordem (revisão antes de geração: ambas citam "prd")
+RULES: list[tuple[str, re.Pattern]] = [
+    (
+        PRD_REVISE,
+        re.compile(
+            r"\b(revis|ajust|alter|mud|corrig|atualiz|adicion|inclu|remov|tir)\w*"
+            r" (o |no |do |ao |esse |nesse |desse |ultimo )*(prd|documento)\b"
+            r"|\b(no|o) prd (revis|ajust|alter|mud|corrig|atualiz)\w*"
+            r"|\b(revis|ajust|alter|mud|corrig|atualiz)\w*( \w+){1,3} (no|do) (prd|documento)\b"
+        ),
+    ),
+    (
+        PRD_GENERATE,
+        re.compile(
+            r"\b(gera|cria|faz|faca|escrev|mont|redig)\w*"
+            r" (o |um |esse |agora |logo )*prd\b"
+        ),
+    ),
+    (
+        SMALL_TALK,
+        re.compile(
+            r"^(oi+|ola|e ai|bom dia|boa tarde|boa noite|valeu|obrigad[oa]|brigad[oa]|"
+            r"beleza|blz|ok|okay|show|perfeito|otimo|massa|tchau|ate mais|ate logo|"
+            r"tudo bem|tudo certo|entendi)"
+            # Até duas palavras de complemento, mas não um pedido ("ok pode gerar")
+            r"( (?!pode|gera|cria|faz|faca|manda|envia|segue|sigo|continua|prossegue|escreve)\w+){0,2}$"
+        ),
+    ),
+]
+
+# Confiança atribuída quando uma regra casa
+RULE_CONFIDENCE = 0.95
+
+# Exemplos semente (inclui mensagens reais das sessões do Telegram)
+SEED_EXAMPLES: list[tuple[str, str]] = [
+    ("Como está a parte de autentificação no projeto?", PM_QA),
+    ("Eu gostaria de saber de como está implementada a autentificação.", PM_QA),
+    ("Como é que está a parte da feature de cadastro do cliente hoje no nosso código?", PM_QA),
+    ("Na verdade, eu queria saber se já tem essa feature aí no nosso projeto e como está hoje.", PM_QA),
+    ("Eu queria desenvolver a função de cadastrar pacientes no projeto.", PM_QA),
+    ("Olá, eu queria conversar com você sobre uma feature de cadastro de cliente vinculada a profissional.", PM_QA),
+    ("O prazo seria para fevereiro, é uma prioridade para agora e pode mudar componentes existentes.", PM_QA),
+    ("A demanda que eu te solicitei anteriormente.", PM_QA),
+    ("como tá o login?", PM_QA),
+    ("quero adicionar login social", PM_QA),
+    ("onde fica a parte de pagamentos?", PM_QA),
+    ("tem algum PR aberto sobre notificações?", PM_QA),
+    ("quais arquivos mexem com o banco de dados?", PM_QA),
+    ("quanto tempo leva pra fazer notificação push?", PM_QA),
+    ("isso impacta o cadastro de pacientes?", PM_QA),
+    ("a prioridade é alta, precisa sair esse mês", PM_QA),
+    # Respostas às perguntas do PM e continuações da conversa
+    ("sim", PM_QA),
+    ("sim, pode seguir", PM_QA),
+    ("pode seguir", PM_QA),
+    ("pode continuar", PM_QA),
+    ("isso, exatamente", PM_QA),
+    ("não, só no iOS por enquanto", PM_QA),
+    ("o prazo é março", PM_QA),
+    ("prazo de duas semanas", PM_QA),
+    ("prioridade alta", PM_QA),
+    ("é mais importante que o pix", PM_QA),
+    ("pode afetar features existentes", PM_QA),
+    ("não pode quebrar o cadastro atual", PM_QA),
+    ("o prazo é março, prioridade alta, pode afetar features existentes", PM_QA),
+    ("gerar prd", PRD_GENERATE),
+    ("cria o prd", PRD_GENERATE),
+    ("pode gerar o PRD dessa demanda", PRD_GENERATE),
+    ("manda o documento de requisitos", PRD_GENERATE),
+    ("fecha o documento e me manda", PRD_GENERATE),
+    ("pode documentar isso pro time", PRD_GENERATE),
+    ("ajusta o prd colocando o prazo de março", PRD_REVISE),
+    ("no documento, muda a prioridade para média", PRD_REVISE),
+    ("faltou incluir o requisito de segurança", PRD_REVISE),
+    ("tira a parte de android do documento", PRD_REVISE),
+    ("corrige a estimativa, são 10 dias", PRD_REVISE),
+    ("oi", SMALL_TALK),
+    ("bom dia, tudo bem?", SMALL_TALK),
+    ("valeu, obrigado", SMALL_TALK),
+    ("beleza", SMALL_TALK),
+    ("show, ficou ótimo", SMALL_TALK),
+    ("tchau, até amanhã", SMALL_TALK),
+    # Agradecimentos que citam o PRD não pedem outro PRD
+    ("recebi o prd, valeu", SMALL_TALK),
+    ("o prd ficou ótimo, obrigado", SMALL_TALK),
+    ("valeu pelo prd", SMALL_TALK),
+    ("obrigado pelo documento", SMALL_TALK),
+    ("gostei do prd, muito bom", SMALL_TALK),
+    ("chegou o documento, perfeito", SMALL_TALK),
+    # Confirmações que pedem para continuar
+    ("ok pode gerar", PRD_GENERATE),
+    ("beleza pode mandar", PRD_GENERATE),
+    ("tudo bem pode seguir", PM_QA),
+]
+
+
+@dataclass
+class IntentResult:
+    """Resultado do roteamento de uma mensagem."""
+
+    intent: str
+    confidence: float
+    # "rule", "classifier", "context" (conversa com o PM em andamento)
+    # ou "llm" (ambíguo, decidido pelo Team leader)
+    source: str
+
+
+def _features(normalized: str) -> list[str]:
+    """Unigramas e bigramas da mensagem normalizada."""
+    tokens = normalized.split()
+    return tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class NaiveBayesClassifier:
+    """
+    Naive Bayes multinomial com suavização de Laplace.
+
+    Pequeno o bastante para treinar na inicialização do bot.
+    """
+
+    def __init__(self):
+        self.class_counts: Counter = Counter()
+        self.feature_counts: dict[str, Counter] = defaultdict(Counter)
+        self.vocabulary: set[str] = set()
+
+    def fit(self, examples: list[tuple[str, str]]) -> "NaiveBayesClassifier":
+        """Treina com pares (texto, intenção)."""
+        for text, intent in examples:
+            features = _features(normalize_text(text))
+            self.class_counts[intent] += 1
+            self.feature_counts[intent].update(features)
+            self.vocabulary.update(features)
+        return self
+
+    def predict(self, text: str) -> tuple[str, float]:
+        """
+        Retorna a intenção mais provável e sua probabilidade posterior.
+        """
+        features = _features(normalize_text(text))
+        total = sum(self.class_counts.values())
+        vocab_size = len(self.vocabulary) or 1
+
+        log_probs = {}
+        for intent, count in self.class_counts.items():
+            counts = self.feature_counts[intent]
+            denominator = sum(counts.values()) + vocab_size
+            log_prob = math.log(count / total)
+            for feature in features:
+                if feature in self.vocabulary:
+                    log_prob += math.log((counts[feature] + 1) / denominator)
+            log_probs[intent] = log_prob
+
+        # Softmax dos log-probs para obter a confiança
+        best = max(log_probs, key=log_probs.get)
+        peak = log_probs[best]
+        norm = sum(math.exp(lp - peak) for lp in log_probs.values())
+        return best, 1 / norm
+
+
+class IntentRouter:
+    """Regras + classificador local, com limiar para casos ambíguos."""
+
+    def __init__(self, examples: list[tuple[str, str]], min_confidence: float):
+        self.min_confidence = min_confidence
+        self.classifier = NaiveBayesClassifier().fit(examples)
+
+    def route(self, message: str, in_conversation: bool = False) -> IntentResult:
+        """
+        Classifica a mensagem.
+
+        Args:
+            message: Mensagem do CEO
+            in_conversation: Se o turno anterior da sessão foi do PM
+
+        Returns:
+            IntentResult: abaixo do limiar, pm_qa (source "context") numa
+            conversa com o PM em andamento, ou AMBIGUOUS fora dela
+        """
+        normalized = normalize_text(message)
+
+        for intent, pattern in RULES:
+            if pattern.search(normalized):
+                return IntentResult(intent, RULE_CONFIDENCE, "rule")
+
+        intent, confidence = self.classifier.predict(message)
+        if confidence < self.min_confidence:
+            # Resposta às perguntas do PM: continua com ele, sem passar pelo leader
+            if in_conversation:
+                return IntentResult(PM_QA, confidence, "context")
+            return IntentResult(AMBIGUOUS, confidence, "llm")
+        return IntentResult(intent, confidence, "classifier")
+
+
+def load_examples(path: str | Path) -> list[tuple[str, str]]:
+    """
+    Carrega exemplos rotulados de um JSONL ({"text": ..., "intent": ...}).
+
+    Linhas sem intenção válida (ainda não revisadas) são ignoradas.
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+
+    examples = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if item.get("intent") in INTENTS:
+            examples.append((item["text"], item["intent"]))
+    return examples
+
+
+def iter_transcript_messages(db_path: str | Path):
+    """
+    Percorre as mensagens do CEO gravadas pelo agno (tabela agno_sessions).
+
+    Só considera runs do Team/agente de topo; runs delegados aos
+    membros (com parent_run_id) contêm instruções do leader, não do CEO.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT runs FROM agno_sessions").fetchall()
+    except sqlite3.OperationalError:
+        return
+    finally:
+        conn.close()
+
+    for (raw_runs,) in rows:
+        runs = json.loads(raw_runs) if raw_runs else []
+        # Versões do agno gravam o JSON duplamente serializado
+        if isinstance(runs, str):
+            runs = json.loads(runs)
+        for run in runs:
+            if run.get("parent_run_id"):
+                continue
+            content = (run.get("input") or {}).get("input_content")
+            if isinstance(content, str) and content.strip():
+                yield content.strip()
+
+
+def export_transcripts(db_path: str | Path, output_path: str | Path) -> int:
+    """
+    Exporta mensagens das sessões para o JSONL de exemplos.
+
+    Cada linha recebe o rótulo previsto pelo roteador atual em
+    "predicted"; o campo "intent" fica vazio até a revisão manual.
+
+    Returns:
+        int: Quantidade de mensagens novas exportadas
+    """
+    output_path = Path(output_path)
+    known = {normalize_text(text) for text, _ in SEED_EXAMPLES}
+    if output_path.exists():
+        for line in output_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                known.add(normalize_text(json.loads(line)["text"]))
+
+    router = get_intent_router()
+    exported = 0
+    with open(output_path, "a", encoding="utf-8") as f:
+        for text in iter_transcript_messages(db_path):
+            if normalize_text(text) in known:
+                continue
+            known.add(normalize_text(text))
+            result = router.route(text)
+            item = {"text": text, "intent": "", "predicted": result.intent}
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            exported += 1
+    return exported
+
+
+# Instância global (singleton)
+_router: IntentRouter | None = None
+
+
+def get_intent_router() -> IntentRouter:
+    """Retorna o roteador treinado com sementes + exemplos rotulados."""
+    global _router
+    if _router is None:
+        examples = SEED_EXAMPLES + load_examples(settings.INTENT_EXAMPLES_PATH)
+        _router = IntentRouter(examples, settings.INTENT_MIN_CONFIDENCE)
+    return _router
+
+
+# Para testes diretos do módulo
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        count = export_transcripts(settings.SQLITE_PATH, settings.INTENT_EXAMPLES_PATH)
+        print(f"✅ {count} mensagens exportadas para {settings.INTENT_EXAMPLES_PATH}")
+        print("   Preencha o campo \"intent\" para usá-las no treino")
+        sys.exit(0)
+
+    router = get_intent_router()
+    labeled = load_examples(settings.INTENT_EXAMPLES_PATH)
+    if labeled:
+        hits = sum(router.route(text).intent == intent for text, intent in labeled)
+        print(f"✅ Acurácia nos exemplos rotulados: {hits}/{len(labeled)}")
+    for text in [
+        "gerar prd", "valeu!", "como tá o login?", "muda o prazo no prd",
+        "recebi o prd, valeu", "o prd ficou ótimo obrigado",
+        "ok pode gerar", "beleza pode mandar", "tudo bem pode seguir", "ok, entendi",
+    ]:
+        result = router.route(text)
+        print(f"   {text!r} → {result.intent} ({result.confidence:.2f}, {result.source})")
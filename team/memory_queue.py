@@ -0,0 +1,179 @@
+"""
+Memory Queue - Extração de memórias do usuário em lote, fora do turno.
+
+Com `enable_user_memories=True`, o agno roda a extração de memórias
+dentro de cada interação: mais uma chamada ao LLM no caminho da
+resposta. No modo "deferred" (MEMORY_EXTRACTION_MODE), os turnos vão
+para uma fila e as memórias são extraídas em lote:
+
+    - quando a sessão fica ociosa por MEMORY_IDLE_SECONDS, ou
+    - a cada MEMORY_FLUSH_INTERVAL_SECONDS, para sessões longas
+
+A leitura continua igual (memórias entram no contexto do Team), mas
+passa a ser eventualmente consistente: uma informação dita agora
+aparece na memória depois do próximo flush.
+
+NOTA:
+    A fila fica em memória. Turnos ainda não processados se perdem se
+    o processo cair; no encerramento normal do bot a fila é esvaziada.
+
+USO:
+    from team.memory_queue import get_memory_extractor
+
+    extractor = get_memory_extractor()
+    extractor.start()
+    extractor.enqueue(user_id="123", session_id="telegram_123", message="...")
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+from agno.memory import MemoryManager
+from agno.models.message import Message
+
+from config import settings
+from team.product_team import TEAM_ID, create_memory_manager
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingSession:
+    """Turnos de uma sessão aguardando extração."""
+
+    user_id: str
+    messages: list[str] = field(default_factory=list)
+    last_activity: float = field(default_factory=time.monotonic)
+    first_enqueued: float = field(default_factory=time.monotonic)
+
+
+class DeferredMemoryExtractor:
+    """
+    Fila de turnos com extração de memórias em lote.
+
+    Uma thread em background verifica periodicamente as sessões e
+    extrai as memórias das que ficaram ociosas (ou que esperam há
+    mais de flush_interval segundos).
+    """
+
+    def __init__(
+        self,
+        memory_manager: MemoryManager,
+        idle_seconds: float,
+        flush_interval: float,
+        team_id: str | None = None,
+    ):
+        self.memory_manager = memory_manager
+        self.idle_seconds = idle_seconds
+        self.flush_interval = flush_interval
+        self.team_id = team_id
+        self._pending: dict[str, PendingSession] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def enqueue(self, user_id: str, session_id: str, message: str) -> None:
+        """
+        Adiciona a mensagem do usuário à fila da sessão.
+
+        Só as mensagens do usuário entram: é delas que o agno extrai memórias.
+        """
+        if not message or not message.strip():
+            return
+        with self._lock:
+            pending = self._pending.get(session_id)
+            if pending is None:
+                pending = self._pending[session_id] = PendingSession(user_id=user_id)
+            pending.messages.append(message)
+            pending.last_activity = time.monotonic()
+
+    def _take_ready(self, force: bool) -> list[PendingSession]:
+        """Remove da fila as sessões prontas para extração."""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for session_id, pending in list(self._pending.items()):
+                idle = now - pending.last_activity >= self.idle_seconds
+                overdue = now - pending.first_enqueued >= self.flush_interval
+                if force or idle or overdue:
+                    ready.append(self._pending.pop(session_id))
+        return ready
+
+    def _extract(self, pending: PendingSession) -> None:
+        """Extrai memórias de um lote de mensagens numa única chamada."""
+        messages = [Message(role="user", content=text) for text in pending.messages]
+        self.memory_manager.create_user_memories(
+            messages=messages,
+            user_id=pending.user_id,
+            team_id=self.team_id,
+        )
+        logger.info(
+            f"[{pending.user_id}] Memórias extraídas de {len(messages)} mensagens"
+        )
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Processa as sessões prontas (ou todas, com force=True).
+
+        Returns:
+            int: Quantidade de sessões processadas
+        """
+        ready = self._take_ready(force)
+        for pending in ready:
+            try:
+                self._extract(pending)
+            except Exception as e:
+                logger.error(f"[{pending.user_id}] Erro ao extrair memórias: {e}", exc_info=True)
+        return len(ready)
+
+    def _run(self) -> None:
+        """Loop da thread em background."""
+        check_every = max(1.0, min(self.idle_seconds, self.flush_interval) / 4)
+        while not self._stop.wait(check_every):
+            self.flush()
+
+    def start(self) -> None:
+        """Inicia a thread de extração (idempotente)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-extractor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Para a thread e extrai o que ainda estiver na fila."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush(force=True)
+
+
+# Instância global (singleton)
+_extractor: DeferredMemoryExtractor | None = None
+
+
+def is_deferred() -> bool:
+    """Indica se a extração de memórias está no modo em lote."""
+    return settings.MEMORY_EXTRACTION_MODE == "deferred"
+
+
+def get_memory_extractor() -> DeferredMemoryExtractor | None:
+    """
+    Retorna o extrator em lote, ou None no modo "inline".
+
+    Usa o mesmo MemoryManager (e banco) do Product Team.
+    """
+    global _extractor
+    if not is_deferred():
+        return None
+    if _extractor is None:
+        _extractor = DeferredMemoryExtractor(
+            memory_manager=create_memory_manager(),
+            idle_seconds=settings.MEMORY_IDLE_SECONDS,
+            flush_interval=settings.MEMORY_FLUSH_INTERVAL_SECONDS,
+            team_id=TEAM_ID,
+        )
+    return _extractor
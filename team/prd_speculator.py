@@ -0,0 +1,304 @@
+"""
+PRD Speculator - Rascunho do PRD em background, antes do "gerar prd".
+
+O PM só deve fechar a demanda com respostas do CEO sobre prazo,
+prioridade e impacto (ver agents.pm_agent). Quando o CEO já respondeu
+às perguntas do PM sobre os três critérios, o Tech Writer começa a
+redigir o PRD enquanto o CEO ainda lê a resposta. Se o próximo pedido
+for "gerar prd", o rascunho sai na hora.
+
+CONSENSO:
+    Um critério só conta quando o PM perguntou sobre ele e a mensagem
+    seguinte do CEO responde (afirmação com o assunto do critério, ou
+    uma confirmação se a pergunta era só sobre ele). Perguntas do CEO
+    ("quantas semanas pra refatorar?") e respostas que adiam ("não sei
+    ainda") nunca contam, e o turno mais recente precisa ser uma resposta.
+
+FLUXO:
+    1. Mensagem nova com conteúdo → `invalidate` (descarta o rascunho)
+    2. Resposta enviada → `add_turn` grava o turno e, se o consenso
+       estiver coberto, agenda o rascunho após PRD_SPECULATION_DELAY_SECONDS
+    3. "gerar prd" → `take` devolve o rascunho da versão atual da sessão,
+       aguardando o que estiver em andamento; sem rascunho, devolve None
+
+CUSTO:
+    - No máximo um rascunho por versão da sessão
+    - Intervalo mínimo de PRD_SPECULATION_COOLDOWN_SECONDS entre rascunhos
+    - Nunca dois rascunhos ao mesmo tempo na sessão: o run do Tech Writer
+      não é interrompível, então um rascunho que já começou vai até o fim
+      (e, se ficou velho, é descartado e contado como "stale")
+
+VERSÃO:
+    Cada sessão tem um contador. Qualquer turno novo incrementa o
+    contador e invalida o rascunho pronto; um rascunho só é usado se
+    foi feito na versão atual.
+
+NOTA:
+    Todos os métodos rodam no event loop do bot (sem locks). O rascunho
+    roda num contexto vazio: fica fora dos traces gravados e dos spans
+    do update que o agendou.
+
+USO:
+    from team.prd_speculator import get_prd_speculator
+
+    speculator = get_prd_speculator(draft_prd)
+    speculator.invalidate("telegram_123")
+    speculator.add_turn("telegram_123", mensagem, resposta)
+    prd = await speculator.take("telegram_123")
+"""
+
+import asyncio
+import contextvars
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from config import settings
+from observability import metrics, recorder
+from observability.spans import root_span
+from tools.text import normalize_text
+
+
+logger = logging.getLogger(__name__)
+
+# Assunto de cada critério nas perguntas do PM (texto normalizado)
+PM_QUESTION_TOPICS = {
+    "prazo": re.compile(r"\b(prazo|deadline|data de entrega)\b"),
+    "prioridade": re.compile(r"\b(prioridade|prioritari[oa]|priorizar)\b"),
+    "impacto": re.compile(r"\b(impacto|impactar|afetar|quebrar|(features?|componentes?) existentes?)\b"),
+}
+
+# Respostas do CEO para cada critério (texto normalizado)
+CONSENSUS_CRITERIA = {
+    "prazo": re.compile(
+        r"\b(prazo|deadline|entrega|sprints?|semanas?|mes|meses|trimestre|q[1-4]"
+        r"|janeiro|fevereiro|marco|abril|maio|junho|julho|agosto|setembro"
+        r"|outubro|novembro|dezembro|ate (o )?(fim|final|dia)|\d{1,2} \d{1,2})\b"
+    ),
+    "prioridade": re.compile(
+        r"\b(prioridade|prioritari[oa]|priorizar|urgente|p[0-3]"
+        r"|(mais|menos) importante|antes d[aeo]s?|depois d[aeo]s?)\b"
+    ),
+    "impacto": re.compile(
+        r"\b(impacto|impactar|afetar|quebrar|compatib\w*|retrocompat\w*"
+        r"|pode mudar|sem mexer|sem alterar|(features?|componentes?|telas?|fluxos?) existentes?)\b"
+    ),
+}
+
+# Confirmações curtas: só respondem a uma pergunta do PM sobre um único critério
+CONFIRMATION = re.compile(r"^(sim|pode|pode sim|ok|isso|exato|claro|tranquilo|beleza|pode ser)\b")
+
+# Respostas que adiam a decisão (não contam para nenhum critério)
+NON_ANSWER = re.compile(
+    r"\b(nao sei|sei la|nao tenho certeza|nao decidi|nao defini|ainda nao (sei|decidi|defini)"
+    r"|talvez|vou ver|depois (eu )?(vejo|te falo|decido|a gente ve))\b"
+)
+
+DRAFT_PROMPT = """
+Gere um PRD baseado nesta conversa entre o CEO e o PM:
+
+{transcript}
+"""
+
+
+def _is_question(message: str) -> bool:
+    """Mensagem do CEO que pergunta em vez de responder."""
+    return "?" in message
+
+
+def covered_criteria(turns: list[tuple[str, str]]) -> set[str]:
+    """
+    Critérios de consenso respondidos pelo CEO.
+
+    Args:
+        turns: (mensagem do CEO, resposta do PM), em ordem
+
+    Returns:
+        set[str]: Critérios em que o PM perguntou e o CEO respondeu no turno seguinte
+
+    NOTA:
+        Se o PM perguntou sobre vários critérios de uma vez, cada um só
+        conta quando a resposta tem o assunto dele; "sim" sozinho só
+        responde a uma pergunta sobre um único critério.
+    """
+    covered = set()
+    for (_, pm_reply), (answer, _) in zip(turns, turns[1:]):
+        if _is_question(answer) or "?" not in pm_reply:
+            continue
+        text = normalize_text(answer)
+        if NON_ANSWER.search(text):
+            continue
+        asked_text = normalize_text(pm_reply)
+        asked = [name for name, topic in PM_QUESTION_TOPICS.items() if topic.search(asked_text)]
+        for name in asked:
+            if CONSENSUS_CRITERIA[name].search(text) or (len(asked) == 1 and CONFIRMATION.search(text)):
+                covered.add(name)
+    return covered
+
+
+@dataclass
+class SessionDraft:
+    """Turnos e rascunho especulativo de uma sessão."""
+
+    turns: list[tuple[str, str]] = field(default_factory=list)
+    version: int = 0
+    draft: str | None = None
+    draft_version: int = -1
+    task: asyncio.Task | None = None
+    # Versão do rascunho agendado e se ele já está gastando tokens
+    task_version: int = -1
+    drafting: bool = False
+    last_started: float = float("-inf")
+
+
+class PrdSpeculator:
+    """
+    Mantém os turnos de cada sessão e redige o PRD em background.
+
+    O rascunho é feito por `draft(prompt)`, a mesma geração do Tech
+    Writer usada no caminho normal.
+    """
+
+    def __init__(
+        self,
+        draft: Callable[[str], Awaitable[str]],
+        delay: float,
+        max_turns: int,
+        cooldown: float,
+    ):
+        self.draft = draft
+        self.delay = delay
+        self.max_turns = max_turns
+        self.cooldown = cooldown
+        self._sessions: dict[str, SessionDraft] = {}
+
+    def _bump(self, state: SessionDraft) -> None:
+        """
+        Nova versão da sessão: descarta o rascunho pronto.
+
+        Um rascunho ainda na espera é cancelado (sem custo); um que já
+        começou a redigir termina e é descartado ao chegar.
+        """
+        state.version += 1
+        state.draft = None
+        if state.task is not None and not state.task.done() and not state.drafting:
+            state.task.cancel()
+            state.task = None
+            metrics.increment("prd.speculation", outcome="cancelled")
+
+    def _busy(self, state: SessionDraft) -> bool:
+        """Indica se há rascunho agendado ou em andamento na sessão."""
+        return state.task is not None and not state.task.done()
+
+    def invalidate(self, session_id: str) -> None:
+        """Chegou mensagem nova: o rascunho atual não vale mais."""
+        state = self._sessions.get(session_id)
+        if state is not None:
+            self._bump(state)
+
+    def add_turn(self, session_id: str, message: str, reply: str) -> None:
+        """Grava o turno e agenda o rascunho se o consenso estiver coberto."""
+        state = self._sessions.setdefault(session_id, SessionDraft())
+        state.turns.append((message, reply))
+        del state.turns[:-self.max_turns]
+        self._bump(state)
+
+        if recorder.is_replaying() or _is_question(message) or self._busy(state):
+            return
+        if time.monotonic() - state.last_started < self.cooldown:
+            return
+        if len(covered_criteria(state.turns)) < len(CONSENSUS_CRITERIA):
+            return
+
+        # Contexto vazio: o rascunho não entra no trace nem nos spans deste update
+        state.task_version = state.version
+        state.task = asyncio.create_task(
+            self._speculate(session_id, state, state.version),
+            context=contextvars.Context(),
+        )
+
+    async def _speculate(self, session_id: str, state: SessionDraft, version: int) -> None:
+        """Espera a sessão ficar quieta e redige o PRD da versão recebida."""
+        await asyncio.sleep(self.delay)
+        if state.version != version:
+            return
+
+        transcript = "\n\n".join(f"CEO: {m}\n\nPM: {r}" for m, r in state.turns)
+        logger.info(f"[{session_id}] Consenso coberto, redigindo PRD em background...")
+        state.drafting = True
+        state.last_started = time.monotonic()
+        try:
+            with root_span("prd.speculate", session_id=session_id):
+                text = await self.draft(DRAFT_PROMPT.format(transcript=transcript))
+        except Exception as e:
+            metrics.increment("prd.speculation", outcome="error")
+            logger.error(f"[{session_id}] Erro no rascunho do PRD: {e}", exc_info=True)
+            return
+        finally:
+            state.drafting = False
+
+        if state.version != version:
+            # Pago e descartado: a sessão mudou enquanto o PRD era redigido
+            metrics.increment("prd.speculation", outcome="stale")
+            return
+        state.draft = text
+        state.draft_version = version
+        metrics.increment("prd.speculation", outcome="drafted")
+        logger.info(f"[{session_id}] Rascunho do PRD pronto")
+
+    async def take(self, session_id: str) -> str | None:
+        """
+        Devolve o rascunho da versão atual da sessão.
+
+        Se o rascunho desta versão estiver em andamento, aguarda ele terminar.
+
+        Returns:
+            str | None: PRD em markdown, ou None se não houver rascunho válido
+        """
+        state = self._sessions.get(session_id)
+        if state is None:
+            metrics.increment("prd.speculation", outcome="miss")
+            return None
+
+        if state.draft is None and self._busy(state) and state.task_version == state.version:
+            metrics.increment("prd.speculation", outcome="awaited")
+            await asyncio.wait({state.task})
+
+        if state.draft is not None and state.draft_version == state.version:
+            metrics.increment("prd.speculation", outcome="hit")
+            return state.draft
+
+        metrics.increment("prd.speculation", outcome="miss")
+        return None
+
+    def reset(self, session_id: str) -> None:
+        """Esquece a sessão (PRD entregue: a próxima demanda começa do zero)."""
+        state = self._sessions.pop(session_id, None)
+        if state is not None:
+            self._bump(state)
+
+
+# Instância global (singleton)
+_speculator: PrdSpeculator | None = None
+
+
+def get_prd_speculator(draft: Callable[[str], Awaitable[str]]) -> PrdSpeculator | None:
+    """
+    Retorna o especulador de PRD, ou None se PRD_SPECULATION_ENABLED=false.
+
+    Args:
+        draft: Corrotina que gera o PRD a partir de um prompt (usada na criação)
+    """
+    global _speculator
+    if not settings.PRD_SPECULATION_ENABLED:
+        return None
+    if _speculator is None:
+        _speculator = PrdSpeculator(
+            draft=draft,
+            delay=settings.PRD_SPECULATION_DELAY_SECONDS,
+            max_turns=settings.PRD_SPECULATION_MAX_TURNS,
+            cooldown=settings.PRD_SPECULATION_COOLDOWN_SECONDS,
+        )
+    return _speculator
@@ -15,6 +15,11 @@ PERSISTÊNCIA:
     - SQLite para sessões (histórico de conversas)
     - SQLite para memória (informações importantes entre sessões)
 
+MEMÓRIA:
+    - MEMORY_EXTRACTION_MODE=inline: o agno extrai memórias a cada turno
+    - MEMORY_EXTRACTION_MODE=deferred: extração em lote fora do turno
+      (ver team.memory_queue); as memórias continuam no contexto
+
 USO:
     from team.product_team import create_product_team
     
@@ -22,11 +27,13 @@ USO:
     response = team.run("Quero adicionar login social")
 """
 
+from agno.memory import MemoryManager
 from agno.team import Team
 from agno.models.openai import OpenAIChat
 from agno.db.sqlite import SqliteDb
 
 from config import settings
+from agents.model_policy import FAST, STRONG, model_id_for
 from agents.pm_agent import create_pm_agent
 from agents.tech_writer import create_tech_writer_agent
 
@@ -64,6 +71,23 @@ Você tem acesso ao histórico. Se o CEO mencionar "a demanda anterior" ou
 "o que conversamos", consulte a memória e continue de onde pararam.
 """
 
+# ID fixo do Team (usado também pela extração de memórias em lote)
+TEAM_ID = "product-team"
+
+
+def create_memory_manager() -> MemoryManager:
+    """
+    Cria o MemoryManager do Team, gravando no SQLite configurado.
+    
+    Returns:
+        MemoryManager: Gerenciador de memórias do usuário
+    """
+    return MemoryManager(
+        db=SqliteDb(db_file=settings.SQLITE_PATH),
+        # Extração de memórias é tarefa simples: tier rápido
+        model=OpenAIChat(id=model_id_for(FAST)),
+    )
+
 
 def create_product_team() -> Team:
     """
@@ -74,8 +98,9 @@ def create_product_team() -> Team:
     - Tech Writer: geração de PRD
     
     Configurações:
-    - Modelo: gpt-4o-mini (via .env)
+    - Modelo: tier forte no leader e nos membros (MODEL_STRONG_ID)
     - Storage: SQLite para memória
+    - Memória: extraída a cada turno ou em lote (MEMORY_EXTRACTION_MODE)
     - Show members: True (mostra quem respondeu)
     
     Returns:
@@ -95,15 +120,22 @@ def create_product_team() -> Team:
         db_file=settings.SQLITE_PATH,
     )
     
+    # No modo em lote, a extração sai do turno e só a leitura fica aqui
+    inline_memories = settings.MEMORY_EXTRACTION_MODE != "deferred"
+    
     # Cria o Team
     team = Team(
+        id=TEAM_ID,
         name="Product Team",
         members=[pm_agent, tech_writer],
-        model=OpenAIChat(id=settings.MODEL_ID),
+        # O leader só recebe mensagens ambíguas, que pedem o modelo forte
+        model=OpenAIChat(id=model_id_for(STRONG)),
         instructions=TEAM_INSTRUCTIONS,
         db=db,
         # Habilita memória para lembrar decisões anteriores
-        enable_user_memories=True,
+        memory_manager=create_memory_manager(),
+        enable_user_memories=inline_memories,
+        add_memories_to_context=True,
         markdown=True,
         # Mostra qual agente respondeu
         show_members_responses=True,
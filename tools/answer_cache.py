@@ -0,0 +1,251 @@
+"""
+Answer Cache - Cache semântico de respostas do PM.
+
+Perguntas quase idênticas sobre o repositório ("como tá o login?",
+"como está o login") são respondidas a partir do cache em vez de
+rodar um turno completo do PM com ferramentas.
+
+CHAVE DO CACHE:
+    - Embedding da pergunta normalizada
+    - SHA do HEAD do GITHUB_REPO
+
+    Uma resposta só é reaproveitada se a similaridade de cosseno for
+    maior ou igual a ANSWER_CACHE_THRESHOLD e o commit for o mesmo.
+
+INVALIDAÇÃO:
+    Quando o HEAD do repositório muda, as entradas de commits
+    anteriores são descartadas na próxima consulta.
+
+PERSONALIZAÇÃO:
+    Mensagens que dependem da conversa ("aquilo que conversamos",
+    "e o logout?", "sim") nunca passam pelo cache.
+
+USO:
+    from tools.answer_cache import get_answer_cache
+
+    cache = get_answer_cache()
+    answer = await cache.lookup("como tá o login?")
+    if answer is None:
+        answer = pm.run(...).content
+        await cache.store("como tá o login?", answer)
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from config import settings
+from tools.embeddings import cosine_similarity, embed_text
+from tools.github_client import get_head_sha
+from tools.text import normalize_text
+
+
+logger = logging.getLogger(__name__)
+
+# Expressões que indicam que a pergunta depende da sessão do usuário
+PERSONAL_MARKERS = (
+    "conversamos",
+    "conversou",
+    "falamos",
+    "a gente falou",
+    "voce lembra",
+    "lembra",
+    "anterior",
+    "de novo",
+    "aquilo",
+    "aquela demanda",
+    "ontem",
+    "meu prd",
+    "o prd",
+)
+
+# Começos de frase que indicam continuação da conversa
+FOLLOW_UP_PREFIXES = ("e ", "mas ", "entao ", "tambem ", "ai ")
+
+# Mensagens muito curtas ("sim", "pode ser") são respostas ao contexto
+MIN_WORDS = 3
+
+
+@dataclass
+class CacheEntry:
+    """Entrada do cache carregada em memória."""
+
+    normalized: str
+    embedding: list[float]
+    answer: str
+
+
+def is_personalized(text: str) -> bool:
+    """
+    Indica se a mensagem depende do contexto da sessão.
+
+    Mensagens personalizadas devem ir direto para o PM.
+    """
+    normalized = normalize_text(text)
+    if len(normalized.split()) < MIN_WORDS:
+        return True
+    if normalized.startswith(FOLLOW_UP_PREFIXES):
+        return True
+    return any(marker in normalized for marker in PERSONAL_MARKERS)
+
+
+class AnswerCache:
+    """
+    Cache de respostas persistido em SQLite.
+
+    As entradas do commit atual ficam em memória para que a busca
+    por similaridade não precise ler o banco a cada mensagem.
+    """
+
+    def __init__(self, db_path: str, threshold: float):
+        self.threshold = threshold
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                commit_sha TEXT NOT NULL,
+                question TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                embedding TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_answers_commit ON answers (commit_sha)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._commit_sha: str | None = None
+        self._entries: list[CacheEntry] = []
+
+    def _load(self, commit_sha: str) -> None:
+        """Carrega as entradas do commit e descarta as de commits anteriores."""
+        with self._lock:
+            if commit_sha == self._commit_sha:
+                return
+
+            deleted = self._conn.execute(
+                "DELETE FROM answers WHERE commit_sha != ?", (commit_sha,)
+            ).rowcount
+            self._conn.commit()
+            if deleted:
+                logger.info(f"Cache invalidado: {deleted} respostas de commits anteriores")
+
+            rows = self._conn.execute(
+                "SELECT normalized, embedding, answer FROM answers WHERE commit_sha = ?",
+                (commit_sha,),
+            ).fetchall()
+            self._entries = [
+                CacheEntry(normalized=n, embedding=json.loads(e), answer=a)
+                for n, e, a in rows
+            ]
+            self._commit_sha = commit_sha
+
+    def _best_match(self, embedding: list[float]) -> tuple[CacheEntry | None, float]:
+        """Retorna a entrada mais parecida e sua similaridade."""
+        best, best_score = None, 0.0
+        for entry in self._entries:
+            score = cosine_similarity(embedding, entry.embedding)
+            if score > best_score:
+                best, best_score = entry, score
+        return best, best_score
+
+    async def lookup(self, question: str) -> str | None:
+        """
+        Procura uma resposta para a pergunta no commit atual.
+
+        Args:
+            question: Mensagem do usuário
+
+        Returns:
+            str | None: Resposta em cache, ou None (miss, bypass ou erro)
+        """
+        # O cache é só otimização: qualquer falha vira miss e o PM responde
+        try:
+            return await self._lookup(question)
+        except Exception as e:
+            logger.warning(f"Falha ao consultar o cache de respostas: {e}", exc_info=True)
+            return None
+
+    async def _lookup(self, question: str) -> str | None:
+        if is_personalized(question):
+            return None
+
+        commit_sha = await asyncio.to_thread(get_head_sha)
+        if commit_sha is None:
+            return None
+        self._load(commit_sha)
+
+        # Match exato da pergunta normalizada dispensa o embedding
+        normalized = normalize_text(question)
+        for entry in self._entries:
+            if entry.normalized == normalized:
+                logger.info("Cache hit (exato)")
+                return entry.answer
+
+        if not self._entries:
+            return None
+
+        embedding = await embed_text(normalized)
+        entry, score = self._best_match(embedding)
+        if entry is not None and score >= self.threshold:
+            logger.info(f"Cache hit (similaridade {score:.3f})")
+            return entry.answer
+
+        return None
+
+    async def store(self, question: str, answer: str) -> None:
+        """
+        Guarda a resposta do PM para o commit atual.
+
+        Perguntas personalizadas não são guardadas.
+        """
+        if is_personalized(question):
+            return
+
+        commit_sha = await asyncio.to_thread(get_head_sha)
+        if commit_sha is None:
+            return
+        self._load(commit_sha)
+
+        normalized = normalize_text(question)
+        embedding = await embed_text(normalized)
+
+        with self._lock:
+            # O HEAD pode ter mudado enquanto o embedding era gerado
+            if commit_sha != self._commit_sha:
+                return
+            self._conn.execute(
+                """
+                INSERT INTO answers (commit_sha, question, normalized, embedding, answer, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (commit_sha, question, normalized, json.dumps(embedding), answer, time.time()),
+            )
+            self._conn.commit()
+            self._entries.append(CacheEntry(normalized, embedding, answer))
+
+
+# Instância global (singleton)
+_cache: AnswerCache | None = None
+
+
+def get_answer_cache() -> AnswerCache | None:
+    """
+    Retorna o cache de respostas, ou None se estiver desabilitado.
+
+    O cache exige GITHUB_REPO configurado (a chave inclui o HEAD).
+    """
+    global _cache
+    if not settings.ANSWER_CACHE_ENABLED or not settings.GITHUB_REPO:
+        return None
+    if _cache is None:
+        _cache = AnswerCache(settings.ANSWER_CACHE_PATH, settings.ANSWER_CACHE_THRESHOLD)
+    return _cache
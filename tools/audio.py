@@ -21,6 +21,7 @@ from pathlib import Path
 from openai import AsyncOpenAI
 
 from config import settings
+from observability.spans import traced
 
 
 # Cliente OpenAI async para transcrições
@@ -76,6 +77,7 @@ async def transcribe_audio(file_path: str | Path) -> str:
     return response
 
 
+@traced("transcribe_audio_bytes")
 async def transcribe_audio_bytes(audio_bytes: bytes, filename: str = "audio.ogg") -> str:
     """
     Transcreve bytes de áudio para texto usando Whisper API.
@@ -0,0 +1,134 @@
+"""
+Code Search Tool - Busca de código em lote no repositório alvo.
+
+O PM costuma buscar vários termos para a mesma pergunta ("login",
+"auth", "signin"). Cada `search_code` custa uma ida e volta do LLM
+mais uma requisição ao GitHub. Esta ferramenta recebe todas as
+buscas de uma vez, roda em paralelo e devolve um único resultado.
+
+LIMITES DO GITHUB:
+    A busca de código tem limite próprio (poucas requisições por minuto)
+    e limites secundários para requisições simultâneas. Por isso no
+    máximo MAX_WORKERS buscas rodam ao mesmo tempo, e uma busca que
+    recebe RateLimitExceededException espera o tempo indicado pelo
+    GitHub (Retry-After / X-RateLimit-Reset) e tenta de novo, até
+    RATE_LIMIT_RETRIES vezes. Se a espera passar de RATE_LIMIT_MAX_WAIT,
+    a busca desiste e o erro vai no resultado.
+
+RESULTADO:
+    - Arquivos deduplicados pelo caminho
+    - Ordenados pela quantidade de buscas que encontraram o arquivo
+    - Formato JSON compacto
+
+USO:
+    from tools.code_search import search_code_batch
+
+    print(search_code_batch(["login", "auth", "signin"]))
+"""
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from github import RateLimitExceededException
+
+from config import settings
+from tools.github_client import get_github
+
+
+logger = logging.getLogger(__name__)
+
+# Limites para manter o resultado compacto
+MAX_QUERIES = 4
+MAX_RESULTS_PER_QUERY = 15
+MAX_FILES = 25
+
+# Buscas simultâneas e novas tentativas quando o GitHub limita a taxa
+MAX_WORKERS = 2
+RATE_LIMIT_RETRIES = 2
+RATE_LIMIT_MAX_WAIT = 15.0
+
+
+def _rate_limit_wait(error: RateLimitExceededException, attempt: int) -> float:
+    """Segundos até poder buscar de novo, segundo os headers do GitHub."""
+    headers = {k.lower(): v for k, v in (getattr(error, "headers", None) or {}).items()}
+    if headers.get("retry-after", "").isdigit():
+        return float(headers["retry-after"])
+    if headers.get("x-ratelimit-reset", "").isdigit():
+        return max(0.0, float(headers["x-ratelimit-reset"]) - time.time()) + 1
+    # Sem header: espera exponencial
+    return 2.0 ** (attempt + 1)
+
+
+def _search_one(query: str, repo: str) -> list[tuple[str, str]]:
+    """Executa uma busca e retorna pares (caminho, url)."""
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            results = get_github().search_code(query=f"{query} repo:{repo}")
+            return [(item.path, item.html_url) for item in islice(results, MAX_RESULTS_PER_QUERY)]
+        except RateLimitExceededException as e:
+            wait = _rate_limit_wait(e, attempt)
+            if attempt == RATE_LIMIT_RETRIES or wait > RATE_LIMIT_MAX_WAIT:
+                raise
+            logger.warning(f"Limite do GitHub na busca '{query}', tentando de novo em {wait:.0f}s")
+            time.sleep(wait)
+
+
+def search_code_batch(queries: list[str], repo: str | None = None) -> str:
+    """
+    Busca vários termos no código do repositório de uma só vez.
+
+    Use esta ferramenta em vez de chamar search_code várias vezes:
+    passe todos os termos relacionados juntos, por exemplo
+    ["login", "auth", "signin"].
+
+    Args:
+        queries: Lista de termos de busca (até 4)
+        repo: Repositório no formato owner/repo (padrão: repositório configurado)
+
+    Returns:
+        str: JSON com os arquivos encontrados, ordenados pela quantidade
+        de termos que aparecem em cada arquivo
+    """
+    repo = repo or settings.GITHUB_REPO
+    if not repo:
+        return json.dumps({"error": "Repositório não configurado"})
+
+    # Remove termos vazios/duplicados mantendo a ordem
+    queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))[:MAX_QUERIES]
+    if not queries:
+        return json.dumps({"error": "Nenhum termo de busca informado"})
+
+    files: dict[str, dict] = {}
+    errors: dict[str, str] = {}
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(queries))) as executor:
+        futures = {query: executor.submit(_search_one, query, repo) for query in queries}
+
+        for query, future in futures.items():
+            try:
+                hits = future.result()
+            except Exception as e:
+                logger.warning(f"Erro na busca '{query}': {e}")
+                errors[query] = str(e)[:200]
+                continue
+
+            for path, url in hits:
+                entry = files.setdefault(path, {"path": path, "url": url, "matches": []})
+                if query not in entry["matches"]:
+                    entry["matches"].append(query)
+
+    ranked = sorted(files.values(), key=lambda f: (-len(f["matches"]), f["path"]))
+
+    result = {
+        "repo": repo,
+        "queries": queries,
+        "total_files": len(ranked),
+        "files": ranked[:MAX_FILES],
+    }
+    if errors:
+        result["errors"] = errors
+
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,303 @@
+"""
+Documents Tool - Ingestão de documentos enviados no Telegram.
+
+O CEO pode mandar PDFs, specs ou markdown para embasar uma demanda.
+O documento é indexado por sessão e o PM recebe só os trechos
+relevantes para cada mensagem, nunca o arquivo inteiro.
+
+PIPELINE (memória limitada em todas as etapas):
+    1. Download em streaming para disco (sem bytearray em memória)
+    2. Leitura incremental: página a página (PDF) ou linha a linha (texto)
+    3. Chunks de DOCUMENT_CHUNK_CHARS com sobreposição
+    4. Embeddings em lotes, gravados em SQLite (data/documents.db)
+
+    A leitura/chunking (pypdf é síncrono e pesado) e a gravação rodam em
+    threads, lote a lote, para não travar os outros updates do bot.
+
+BUSCA:
+    Só trechos com similaridade >= DOCUMENT_MIN_SCORE entram no prompt;
+    a leitura e o cálculo também rodam em thread. Os documentos da
+    sessão são apagados quando o PRD é entregue (`clear`).
+
+FORMATOS SUPORTADOS:
+    - pdf (requer `pypdf` instalado)
+    - md, txt, json, yaml, csv e demais arquivos de texto
+
+USO:
+    from tools.documents import get_document_index
+
+    index = get_document_index()
+    chunks = await index.ingest("telegram_123", "spec.pdf", Path("/tmp/spec.pdf"))
+    context = await index.context_for("telegram_123", "qual o prazo?")
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from itertools import islice
+from pathlib import Path
+
+import httpx
+
+from config import settings
+from tools.embeddings import cosine_similarity, embed_text, embed_texts
+
+
+logger = logging.getLogger(__name__)
+
+# Tamanho dos blocos no download e no lote de embeddings
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+EMBEDDING_BATCH = 32
+
+# Extensões tratadas como texto puro
+TEXT_EXTENSIONS = {
+    ".md", ".markdown", ".txt", ".rst", ".json", ".yaml", ".yml", ".csv",
+    ".html", ".xml", ".py", ".js", ".ts", ".sql",
+}
+
+
+class DocumentError(Exception):
+    """Documento não suportado, grande demais ou ilegível."""
+
+
+async def download_to_disk(file, dest: Path) -> int:
+    """
+    Baixa um arquivo do Telegram direto para o disco, em blocos.
+
+    Args:
+        file: telegram.File retornado por get_file()
+        dest: Caminho de destino
+
+    Returns:
+        int: Bytes gravados
+
+    Raises:
+        DocumentError: Se passar de DOCUMENT_MAX_BYTES
+    """
+    url = file.file_path or ""
+    if not url.startswith(("http://", "https://")):
+        # Bot API local: o arquivo já está no disco do servidor
+        await file.download_to_drive(custom_path=dest)
+        return dest.stat().st_size
+
+    written = 0
+    async with httpx.AsyncClient(timeout=60) as client:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            with open(dest, "wb") as f:
+                async for block in response.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                    written += len(block)
+                    if written > settings.DOCUMENT_MAX_BYTES:
+                        raise DocumentError("Documento grande demais")
+                    f.write(block)
+    return written
+
+
+def iter_document_text(path: Path, filename: str) -> Iterator[str]:
+    """
+    Lê o documento aos poucos, devolvendo trechos de texto.
+
+    PDFs são lidos página a página; textos, linha a linha.
+    """
+    suffix = Path(filename).suffix.lower()
+
+    if suffix == ".pdf":
+        try:
+            from pypdf import PdfReader
+        except ImportError as e:
+            raise DocumentError("Leitura de PDF requer o pacote pypdf") from e
+        reader = PdfReader(path)
+        for page in reader.pages:
+            yield (page.extract_text() or "") + "\n"
+        return
+
+    if suffix not in TEXT_EXTENSIONS:
+        raise DocumentError(f"Formato não suportado: {suffix or filename}")
+
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield from f
+
+
+def iter_chunks(segments: Iterator[str], size: int, overlap: int) -> Iterator[str]:
+    """
+    Agrupa trechos de texto em chunks de ~size caracteres.
+
+    O buffer nunca passa de size + um trecho de entrada, e cada chunk
+    repete os últimos `overlap` caracteres do anterior.
+    """
+    buffer = ""
+    for segment in segments:
+        buffer += segment
+        while len(buffer) >= size:
+            # Corta no último espaço para não partir palavras
+            cut = buffer.rfind(" ", size // 2, size)
+            cut = cut if cut > 0 else size
+            chunk = buffer[:cut].strip()
+            if chunk:
+                yield chunk
+            buffer = buffer[cut - min(overlap, cut // 2):]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+class DocumentIndex:
+    """Chunks e embeddings dos documentos de cada sessão, em SQLite."""
+
+    def __init__(self, db_path: str):
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                document TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                embedding TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chunks_session ON chunks (session_id)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def _delete(self, session_id: str, document: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE session_id = ? AND document = ?",
+                (session_id, document),
+            )
+            self._conn.commit()
+
+    def _insert(self, session_id: str, document: str, start: int, texts: list[str], vectors: list[list[float]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO chunks (session_id, document, position, text, embedding, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (session_id, document, start + i, text, json.dumps(vector), now)
+                    for i, (text, vector) in enumerate(zip(texts, vectors))
+                ],
+            )
+            self._conn.commit()
+
+    async def ingest(self, session_id: str, document: str, path: Path) -> int:
+        """
+        Indexa um documento para a sessão.
+
+        Os chunks são lidos, vetorizados e gravados em lotes de
+        EMBEDDING_BATCH, então só um lote fica em memória por vez. A
+        leitura de cada lote roda em thread (fora do event loop).
+
+        Returns:
+            int: Quantidade de chunks indexados
+        """
+        chunks = iter_chunks(
+            iter_document_text(path, document),
+            settings.DOCUMENT_CHUNK_CHARS,
+            settings.DOCUMENT_CHUNK_OVERLAP,
+        )
+
+        # Reenviar o mesmo arquivo substitui a versão anterior
+        await asyncio.to_thread(self._delete, session_id, document)
+
+        total = 0
+        while total < settings.DOCUMENT_MAX_CHUNKS:
+            size = min(EMBEDDING_BATCH, settings.DOCUMENT_MAX_CHUNKS - total)
+            batch = await asyncio.to_thread(lambda: list(islice(chunks, size)))
+            if not batch:
+                break
+            vectors = await embed_texts(batch)
+            await asyncio.to_thread(self._insert, session_id, document, total, batch, vectors)
+            total += len(batch)
+        else:
+            logger.warning(f"{document}: limite de {settings.DOCUMENT_MAX_CHUNKS} chunks atingido")
+
+        logger.info(f"[{session_id}] {document}: {total} chunks indexados")
+        return total
+
+    def has_documents(self, session_id: str) -> bool:
+        """Indica se a sessão tem documentos indexados (sem chamar a API)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM chunks WHERE session_id = ? LIMIT 1", (session_id,)
+            ).fetchone()
+        return row is not None
+
+    def _top_k(self, session_id: str, query_vector: list[float], k: int) -> list[tuple[str, str, float]]:
+        best: list[tuple[float, str, str]] = []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT document, text, embedding FROM chunks WHERE session_id = ?",
+                (session_id,),
+            )
+            for document, text, embedding in rows:
+                score = cosine_similarity(query_vector, json.loads(embedding))
+                best.append((score, document, text))
+                # Mantém só os k melhores em memória
+                if len(best) > k * 4:
+                    best = sorted(best, reverse=True)[:k]
+
+        return [(doc, text, score) for score, doc, text in sorted(best, reverse=True)[:k]]
+
+    async def search(self, session_id: str, query: str, k: int) -> list[tuple[str, str, float]]:
+        """
+        Busca os k chunks mais parecidos com a consulta.
+
+        A leitura e o cálculo de similaridade rodam em thread (fora do
+        event loop): o custo cresce com cada documento da sessão.
+
+        Returns:
+            list[tuple[str, str, float]]: (documento, texto, similaridade)
+        """
+        query_vector = await embed_text(query)
+        return await asyncio.to_thread(self._top_k, session_id, query_vector, k)
+
+    def _clear(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    async def clear(self, session_id: str) -> None:
+        """Remove os documentos da sessão (PRD entregue: a demanda acabou)."""
+        await asyncio.to_thread(self._clear, session_id)
+
+    async def context_for(self, session_id: str, query: str) -> str:
+        """
+        Monta o bloco de contexto com os trechos relevantes para o PM.
+
+        Só entram trechos com similaridade >= DOCUMENT_MIN_SCORE. Retorna
+        "" se a sessão não tiver documentos ou nenhum trecho relevante.
+        """
+        if not await asyncio.to_thread(self.has_documents, session_id):
+            return ""
+
+        hits = await self.search(session_id, query, settings.DOCUMENT_TOP_K)
+        hits = [hit for hit in hits if hit[2] >= settings.DOCUMENT_MIN_SCORE]
+        if not hits:
+            return ""
+
+        parts = [f"[{doc}]\n{text}" for doc, text, _ in hits]
+        return "## TRECHOS DOS DOCUMENTOS ENVIADOS PELO CEO\n\n" + "\n\n---\n\n".join(parts)
+
+
+# Instância global (singleton)
+_index: DocumentIndex | None = None
+
+
+def get_document_index() -> DocumentIndex:
+    """Retorna o índice de documentos (singleton)."""
+    global _index
+    if _index is None:
+        _index = DocumentIndex(settings.DOCUMENTS_PATH)
+    return _index
@@ -0,0 +1,77 @@
+"""
+Embeddings Tool - Vetores de texto via OpenAI Embeddings API.
+
+Este módulo gera embeddings e compara vetores, sem dependências
+numéricas pesadas (os vetores são listas de float).
+
+USO:
+    from tools.embeddings import embed_texts, cosine_similarity
+
+    a, b = await embed_texts(["como tá o login?", "como está o login"])
+    print(cosine_similarity(a, b))
+"""
+
+import math
+
+from openai import AsyncOpenAI
+
+from config import settings
+
+
+# Cliente OpenAI async para embeddings
+_client: AsyncOpenAI | None = None
+
+
+def _get_client() -> AsyncOpenAI:
+    """
+    Retorna o cliente OpenAI (singleton).
+
+    Cria o cliente apenas uma vez e reutiliza.
+    """
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    return _client
+
+
+async def embed_texts(texts: list[str]) -> list[list[float]]:
+    """
+    Gera embeddings para uma lista de textos em uma única chamada.
+
+    Args:
+        texts: Textos a vetorizar
+
+    Returns:
+        list[list[float]]: Um vetor por texto, na mesma ordem
+    """
+    if not texts:
+        return []
+
+    client = _get_client()
+    response = await client.embeddings.create(
+        model=settings.EMBEDDING_MODEL_ID,
+        input=texts,
+    )
+
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
+async def embed_text(text: str) -> list[float]:
+    """Gera o embedding de um único texto."""
+    vectors = await embed_texts([text])
+    return vectors[0]
+
+
+def cosine_similarity(a: list[float], b: list[float]) -> float:
+    """
+    Similaridade de cosseno entre dois vetores.
+
+    Returns:
+        float: Valor entre -1 e 1 (0 se algum vetor for nulo)
+    """
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
@@ -0,0 +1,104 @@
+"""
+GitHub Client - Acesso compartilhado ao repositório alvo.
+
+Este módulo centraliza o cliente PyGithub usado fora do GithubTools
+(cache, buscas em lote, digest do repositório).
+
+USO:
+    from tools.github_client import get_head_sha
+
+    sha = get_head_sha()
+    print(f"HEAD atual: {sha}")
+
+NOTA:
+    O SHA do HEAD é reaproveitado por GITHUB_HEAD_TTL segundos para
+    não gastar uma requisição ao GitHub a cada mensagem.
+"""
+
+import logging
+import threading
+import time
+
+from github import Github
+from github.Repository import Repository
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Cliente e repositório (singletons)
+_github: Github | None = None
+_repo: Repository | None = None
+
+# Cache do HEAD: (sha, timestamp da consulta)
+_head_cache: tuple[str, float] | None = None
+_head_lock = threading.Lock()
+
+
+def get_github() -> Github:
+    """
+    Retorna o cliente PyGithub (singleton).
+
+    Usa o token do .env quando configurado.
+    """
+    global _github
+    if _github is None:
+        _github = Github(settings.GITHUB_ACCESS_TOKEN or None)
+    return _github
+
+
+def get_repo() -> Repository:
+    """
+    Retorna o repositório alvo (GITHUB_REPO).
+
+    Raises:
+        ValueError: Se GITHUB_REPO não estiver configurado
+    """
+    global _repo
+    if not settings.GITHUB_REPO:
+        raise ValueError("GITHUB_REPO não configurado")
+    if _repo is None:
+        _repo = get_github().get_repo(settings.GITHUB_REPO)
+    return _repo
+
+
+def get_head_sha(force: bool = False) -> str | None:
+    """
+    Retorna o SHA do último commit da branch padrão do repositório alvo.
+
+    Args:
+        force: Ignora o cache e consulta o GitHub
+
+    Returns:
+        str | None: SHA do HEAD, ou None se o repo não estiver
+        configurado ou o GitHub estiver inacessível
+
+    Example:
+        >>> sha = get_head_sha()
+        >>> print(sha[:7])
+    """
+    global _head_cache
+
+    if not settings.GITHUB_REPO:
+        return None
+
+    with _head_lock:
+        now = time.monotonic()
+        if (
+            not force
+            and _head_cache is not None
+            and now - _head_cache[1] < settings.GITHUB_HEAD_TTL
+        ):
+            return _head_cache[0]
+
+        try:
+            repo = get_repo()
+            sha = repo.get_branch(repo.default_branch).commit.sha
+        except Exception as e:
+            logger.warning(f"Não consegui consultar o HEAD de {settings.GITHUB_REPO}: {e}")
+            # Mantém o último SHA conhecido, se houver
+            return _head_cache[0] if _head_cache else None
+
+        _head_cache = (sha, now)
+        return sha
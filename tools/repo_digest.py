@@ -0,0 +1,384 @@
+"""
+Repo Digest - Resumo pré-calculado do repositório alvo por commit.
+
+Em vez de o PM chamar `get_repository` e explorar a árvore a cada
+conversa, um job em background monta um digest compacto do
+GITHUB_REPO a cada novo commit e ele vai direto nas instruções do PM.
+
+CONTEÚDO DO DIGEST:
+    - Árvore de arquivos (agrupada por diretório)
+    - Resumo de cada módulo (1 frase, via LLM)
+    - Símbolos principais (classes, funções, exports)
+
+INCREMENTAL:
+    Cada arquivo guarda o SHA do blob. Num novo commit, só os arquivos
+    cujo blob mudou são resumidos de novo; o resto é reaproveitado.
+
+ARMAZENAMENTO:
+    data/repo_digest.json
+
+USO:
+    from tools.repo_digest import start_digest_watcher, get_digest_text
+
+    start_digest_watcher()      # thread em background
+    print(get_digest_text())    # digest renderizado (ou "")
+"""
+
+import base64
+import json
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+
+from openai import OpenAI
+
+from config import settings
+from tools.github_client import get_head_sha, get_repo
+
+
+logger = logging.getLogger(__name__)
+
+# Extensões consideradas código/documentação relevante
+SOURCE_EXTENSIONS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".go", ".java", ".kt", ".rb",
+    ".php", ".cs", ".swift", ".rs", ".dart", ".vue", ".sql", ".md",
+}
+
+# Diretórios ignorados (gerados, dependências, assets)
+IGNORED_DIRS = {
+    "node_modules", "dist", "build", "vendor", ".git", ".github",
+    "__pycache__", ".venv", "venv", "coverage", ".next", "migrations",
+}
+
+# Arquivos maiores que isso não são resumidos (só aparecem na árvore)
+MAX_FILE_BYTES = 100_000
+
+# Trecho do arquivo enviado ao LLM para resumo
+SUMMARY_INPUT_CHARS = 6000
+
+# Máximo de símbolos listados por arquivo
+MAX_SYMBOLS = 8
+
+# Padrões de símbolos por extensão
+SYMBOL_PATTERNS: dict[str, re.Pattern] = {
+    ".py": re.compile(r"^(?:async\s+)?(?:def|class)\s+([A-Za-z_]\w*)", re.M),
+    ".js": re.compile(
+        r"^(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:function|class|const|let)\s+([A-Za-z_$][\w$]*)",
+        re.M,
+    ),
+    ".go": re.compile(r"^(?:func|type)\s+(?:\([^)]*\)\s*)?([A-Za-z_]\w*)", re.M),
+    ".java": re.compile(r"^\s*(?:public\s+)?(?:abstract\s+)?(?:class|interface|enum)\s+(\w+)", re.M),
+    ".rb": re.compile(r"^\s*(?:def|class|module)\s+([\w.:]+)", re.M),
+    ".php": re.compile(r"^\s*(?:abstract\s+)?(?:function|class|interface|trait)\s+(\w+)", re.M),
+    ".rs": re.compile(r"^\s*(?:pub\s+)?(?:fn|struct|enum|trait)\s+(\w+)", re.M),
+    ".md": re.compile(r"^#{1,2}\s+(.+)$", re.M),
+}
+for _ext in (".jsx", ".ts", ".tsx", ".vue"):
+    SYMBOL_PATTERNS[_ext] = SYMBOL_PATTERNS[".js"]
+SYMBOL_PATTERNS[".kt"] = SYMBOL_PATTERNS[".java"]
+SYMBOL_PATTERNS[".cs"] = SYMBOL_PATTERNS[".java"]
+SYMBOL_PATTERNS[".swift"] = re.compile(r"^\s*(?:public\s+)?(?:func|class|struct|enum|protocol)\s+(\w+)", re.M)
+SYMBOL_PATTERNS[".dart"] = re.compile(r"^\s*(?:abstract\s+)?class\s+(\w+)", re.M)
+
+SUMMARY_PROMPT = (
+    "Resuma em UMA frase curta, em português, a responsabilidade deste "
+    "arquivo dentro do projeto. Responda só com a frase.\n\n"
+    "Arquivo: {path}\n\n{content}"
+)
+
+# Digest atual em memória (atualizado pelo watcher)
+_digest: dict | None = None
+_digest_text: str = ""
+_digest_lock = threading.Lock()
+
+# Thread do watcher
+_watcher: threading.Thread | None = None
+
+# Cliente OpenAI para os resumos
+_client: OpenAI | None = None
+
+
+def _get_client() -> OpenAI:
+    """
+    Retorna o cliente OpenAI (singleton).
+
+    Os resumos rodam em threads, então o cliente é síncrono.
+    """
+    global _client
+    if _client is None:
+        _client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    return _client
+
+
+def _is_source(path: str) -> bool:
+    """Indica se o arquivo entra no digest."""
+    parts = PurePosixPath(path).parts
+    if any(part in IGNORED_DIRS for part in parts[:-1]):
+        return False
+    return PurePosixPath(path).suffix.lower() in SOURCE_EXTENSIONS
+
+
+def extract_symbols(path: str, content: str) -> list[str]:
+    """Extrai os principais símbolos do arquivo (classes, funções, títulos)."""
+    pattern = SYMBOL_PATTERNS.get(PurePosixPath(path).suffix.lower())
+    if pattern is None:
+        return []
+
+    symbols = []
+    for name in pattern.findall(content):
+        name = name.strip()
+        if name and not name.startswith("_") and name not in symbols:
+            symbols.append(name)
+        if len(symbols) >= MAX_SYMBOLS:
+            break
+    return symbols
+
+
+def summarize_file(path: str, content: str) -> str:
+    """
+    Resume o arquivo em uma frase usando o LLM.
+
+    Em caso de erro, usa a primeira linha de docstring/comentário.
+    """
+    try:
+        response = _get_client().chat.completions.create(
+            model=settings.MODEL_FAST_ID,
+            messages=[
+                {
+                    "role": "user",
+                    "content": SUMMARY_PROMPT.format(path=path, content=content[:SUMMARY_INPUT_CHARS]),
+                }
+            ],
+            max_tokens=60,
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.warning(f"Falha ao resumir {path}: {e}")
+
+    for line in content.splitlines():
+        line = line.strip().strip('"#/*').strip()
+        if len(line) > 10:
+            return line[:160]
+    return ""
+
+
+def _describe_file(path: str, blob_sha: str) -> dict:
+    """Baixa o blob e gera resumo + símbolos."""
+    blob = get_repo().get_git_blob(blob_sha)
+    text = base64.b64decode(blob.content).decode("utf-8", errors="replace")
+    return {
+        "blob_sha": blob_sha,
+        "summary": summarize_file(path, text),
+        "symbols": extract_symbols(path, text),
+    }
+
+
+def load_digest(path: str | Path | None = None) -> dict | None:
+    """Carrega o digest salvo em disco (ou None)."""
+    path = Path(path or settings.REPO_DIGEST_PATH)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Digest inválido em {path}: {e}")
+        return None
+
+
+def build_digest(commit_sha: str, previous: dict | None = None) -> dict:
+    """
+    Monta o digest do repositório no commit informado.
+
+    Args:
+        commit_sha: Commit a descrever
+        previous: Digest anterior (arquivos com o mesmo blob são reaproveitados)
+
+    Returns:
+        dict: Digest com árvore, resumos e símbolos
+    """
+    repo = get_repo()
+    tree = repo.get_git_tree(commit_sha, recursive=True).tree
+    blobs = [item for item in tree if item.type == "blob"]
+
+    previous_files = (previous or {}).get("files", {})
+    if (previous or {}).get("repo") != settings.GITHUB_REPO:
+        previous_files = {}
+
+    files: dict[str, dict] = {}
+    to_describe: list[tuple[str, str]] = []
+
+    sources = [b for b in blobs if _is_source(b.path) and (b.size or 0) <= MAX_FILE_BYTES]
+    for blob in sources[: settings.REPO_DIGEST_MAX_FILES]:
+        cached = previous_files.get(blob.path)
+        if cached and cached.get("blob_sha") == blob.sha:
+            files[blob.path] = cached
+        else:
+            to_describe.append((blob.path, blob.sha))
+
+    logger.info(
+        f"Digest {commit_sha[:7]}: {len(files)} arquivos reaproveitados, "
+        f"{len(to_describe)} para resumir"
+    )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {path: executor.submit(_describe_file, path, sha) for path, sha in to_describe}
+        for path, future in futures.items():
+            try:
+                files[path] = future.result()
+            except Exception as e:
+                logger.warning(f"Não consegui descrever {path}: {e}")
+
+    return {
+        "repo": settings.GITHUB_REPO,
+        "commit_sha": commit_sha,
+        "tree": sorted(b.path for b in blobs if not any(
+            part in IGNORED_DIRS for part in PurePosixPath(b.path).parts[:-1]
+        )),
+        "files": dict(sorted(files.items())),
+    }
+
+
+def render_digest(digest: dict, max_chars: int | None = None) -> str:
+    """
+    Renderiza o digest em markdown compacto para as instruções do PM.
+
+    O texto é cortado em max_chars (padrão: REPO_DIGEST_MAX_CHARS).
+    Os módulos (resumos e símbolos, a parte cara) vêm primeiro; a
+    árvore usa o que sobrar, com os arquivos por diretório ou, se não
+    couber, só a contagem de arquivos de cada diretório.
+    """
+    max_chars = max_chars or settings.REPO_DIGEST_MAX_CHARS
+    marker = "\n- (digest truncado)"
+
+    def truncate(text: str, limit: int) -> str:
+        # O aviso de corte também cabe no limite
+        if len(text) <= limit:
+            return text
+        if limit < len(marker):
+            return ""
+        return text[:limit - len(marker)].rsplit("\n", 1)[0] + marker
+
+    lines = [
+        f"## DIGEST DO REPOSITÓRIO ({digest['repo']} @ {digest['commit_sha'][:7]})",
+        "",
+        "### Módulos",
+    ]
+    for path, info in digest.get("files", {}).items():
+        line = f"- `{path}`: {info.get('summary', '')}"
+        if info.get("symbols"):
+            line += f" [{', '.join(info['symbols'])}]"
+        lines.append(line)
+    text = truncate("\n".join(lines), max_chars)
+
+    # Árvore agrupada por diretório, no espaço restante
+    by_dir: dict[str, list[str]] = {}
+    for path in digest.get("tree", []):
+        p = PurePosixPath(path)
+        by_dir.setdefault(str(p.parent), []).append(p.name)
+    if not by_dir:
+        return text
+
+    header = "\n\n### Árvore\n"
+    budget = max_chars - len(text) - len(header)
+    full = "\n".join(
+        f"- {directory}/: {', '.join(sorted(names))}" for directory, names in sorted(by_dir.items())
+    )
+    if len(full) > budget:
+        full = "\n".join(
+            f"- {directory}/: {len(names)} arquivos" for directory, names in sorted(by_dir.items())
+        )
+    tree = truncate(full, budget) if budget > 0 else ""
+    if not tree:
+        return text
+    return text + header + tree
+
+
+def _set_digest(digest: dict | None) -> None:
+    """Atualiza o digest em memória."""
+    global _digest, _digest_text
+    with _digest_lock:
+        _digest = digest
+        _digest_text = render_digest(digest) if digest else ""
+
+
+def get_digest_text() -> str:
+    """
+    Retorna o digest renderizado do commit mais recente já processado.
+
+    Retorna "" se o digest estiver desabilitado ou ainda não existir.
+    """
+    if not settings.REPO_DIGEST_ENABLED:
+        return ""
+    if _digest is None:
+        stored = load_digest()
+        if stored and stored.get("repo") == settings.GITHUB_REPO:
+            _set_digest(stored)
+    return _digest_text
+
+
+def refresh_digest() -> bool:
+    """
+    Reconstrói o digest se o HEAD mudou.
+
+    Returns:
+        bool: True se um novo digest foi gerado
+    """
+    commit_sha = get_head_sha(force=True)
+    if commit_sha is None:
+        return False
+
+    previous = _digest or load_digest()
+    if previous and previous.get("repo") == settings.GITHUB_REPO and previous.get("commit_sha") == commit_sha:
+        if _digest is None:
+            _set_digest(previous)
+        return False
+
+    digest = build_digest(commit_sha, previous)
+
+    path = Path(settings.REPO_DIGEST_PATH)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(digest, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(path)
+
+    _set_digest(digest)
+    logger.info(f"Digest atualizado para {commit_sha[:7]} ({len(digest['files'])} módulos)")
+    return True
+
+
+def _watch(stop: threading.Event) -> None:
+    """Loop do watcher: verifica o HEAD periodicamente."""
+    while not stop.is_set():
+        try:
+            refresh_digest()
+        except Exception as e:
+            logger.error(f"Erro ao atualizar digest: {e}", exc_info=True)
+        stop.wait(settings.REPO_DIGEST_POLL_SECONDS)
+
+
+def start_digest_watcher() -> threading.Event | None:
+    """
+    Inicia a thread que mantém o digest atualizado.
+
+    Returns:
+        threading.Event | None: Evento para parar o watcher, ou None
+        se o digest estiver desabilitado
+    """
+    global _watcher
+    if not settings.REPO_DIGEST_ENABLED or not settings.GITHUB_REPO:
+        return None
+    if _watcher is not None and _watcher.is_alive():
+        return None
+
+    stop = threading.Event()
+    _watcher = threading.Thread(target=_watch, args=(stop,), name="repo-digest", daemon=True)
+    _watcher.start()
+    return stop
+
+
+# Para testes diretos do módulo
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    refresh_digest()
+    print(get_digest_text() or "❌ Digest não gerado (GITHUB_REPO configurado?)")
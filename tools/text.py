@@ -0,0 +1,24 @@
+"""
+Text - Normalização de texto compartilhada.
+
+Usada para comparar mensagens do CEO sem depender de acentos,
+pontuação ou caixa (cache de respostas, roteador de intenções,
+detecção de consenso do PRD).
+"""
+
+import re
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    """
+    Minúsculas, sem acentos, sem pontuação e sem espaços duplicados.
+
+    Example:
+        >>> normalize_text("Como tá o LOGIN?")
+        'como ta o login'
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())